@@ -37,7 +37,10 @@ def create_card_layout(order):
         order (pd.Series): A row from the orders dataframe
     """
     # Get the order details with fallbacks for missing data
-    order_id = order.get('Hour', 'unknown')
+    order_id = order.get('Order ID')
+    if not isinstance(order_id, str) or not order_id:
+        # Orders placed before the Order ID column existed: use the sheet row number
+        order_id = f"row-{order.name}"
     item = order.get('Item', 'Unknown Item')
     quantity = order.get('Quantity', '1')
     status = order.get('Status', 'In Process')
@@ -0,0 +1,201 @@
+import asyncio
+import threading
+
+import aiohttp
+import pandas as pd
+from gspread.utils import absolute_range_name
+
+from data.client_pool import client_pool
+from data.quota import quota_scheduler
+from data.ranges import a1_range, block_ranges, column_blocks, header_matches, stitch_blocks
+from data.schemas import locate_header, parse_values, range_start_row, schema_for
+from data.test_data_manager import DRIVE_FILE_URL, workbook_version
+
+# Point d'accès REST de lecture groupée des valeurs
+SHEETS_VALUES_URL = "https://sheets.googleapis.com/v4/spreadsheets/{}/values:batchGet"
+
+
+class _LoopThread:
+    """Boucle asyncio dédiée, exécutée dans un thread de fond (façade synchrone)."""
+
+    def __init__(self):
+        self._loop = None
+        self._lock = threading.Lock()
+
+    def loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="sheets-asyncio", daemon=True).start()
+            return self._loop
+
+    def run(self, coro, timeout=None):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop()).result(timeout)
+
+
+_loop_thread = _LoopThread()
+
+
+async def _gather(*coros):
+    return await asyncio.gather(*coros)
+
+
+class AsyncGoogleSheetsManager:
+    """
+    Variante asyncio des lectures de GoogleSheetsManager, sur l'API REST Sheets (aiohttp).
+
+    Les requêtes partagent une session HTTP, le jeton du pool de clients et
+    l'ordonnanceur de quota. Plusieurs lectures attendues ensemble ne coûtent que
+    la durée de la plus lente.
+
+    Les coroutines s'exécutent dans une boucle de fond propre au processus : le code
+    synchrone (Streamlit) passe par `run` ou `gather`.
+
+    Args:
+        timeout (float): Délai maximal d'une requête, en secondes
+        limit (int): Nombre maximal de connexions HTTP simultanées
+    """
+
+    def __init__(self, timeout=30, limit=16):
+        self.timeout = timeout
+        self.limit = limit
+        self._session = None
+
+    def _get_session(self):
+        # Créée dans la boucle de fond, à laquelle elle reste liée
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                connector=aiohttp.TCPConnector(limit=self.limit),
+            )
+        return self._session
+
+    async def _get_json(self, url, params):
+        session = self._get_session()
+        # Le rafraîchissement éventuel du jeton est bloquant : hors de la boucle
+        token = await asyncio.to_thread(client_pool.token)
+
+        async def send():
+            async with session.get(url, params=params, headers={"Authorization": f"Bearer {token}"}) as response:
+                response.raise_for_status()
+                return await response.json()
+
+        return await quota_scheduler.call_async("GET", url, send)
+
+    async def get_version(self, sheet_id):
+        """Sonde de fraîcheur (voir GoogleSheetsManager.get_version) ; None si elle échoue."""
+        try:
+            data = await self._get_json(
+                DRIVE_FILE_URL.format(sheet_id),
+                [("fields", "modifiedTime"), ("supportsAllDrives", "true")],
+            )
+        except Exception as e:
+            print(f"Sonde de fraîcheur indisponible: {e}")
+            return None
+        return workbook_version(sheet_id, data["modifiedTime"])
+
+    async def get_values(self, sheet_id, ranges):
+        """Valeurs brutes de plusieurs plages en un seul batchGet : {plage: lignes}."""
+        params = [("ranges", a1_range(name)) for name in ranges]
+        params.append(("majorDimension", "ROWS"))
+        data = await self._get_json(SHEETS_VALUES_URL.format(sheet_id), params)
+        return {
+            name: value_range.get("values", [])
+            for name, value_range in zip(ranges, data.get("valueRanges", []))
+        }
+
+    async def get_headers(self, sheet_id, worksheet_names):
+        """En-têtes de plusieurs feuilles en un seul batchGet : {feuille: (index, en-tête)}."""
+        if not worksheet_names:
+            return {}
+        scans = {name: absolute_range_name(name, f"1:{schema_for(name).header_scan}") for name in worksheet_names}
+        values = await self.get_values(sheet_id, list(scans.values()))
+        return {name: locate_header(values[scan], schema_for(name)) for name, scan in scans.items()}
+
+    async def read_data(self, sheet_id, worksheet_name, columns=None, header=None):
+        """
+        Lit une feuille ; les erreurs sont levées (voir get_data).
+
+        Si l'en-tête de la feuille est connu, seules les colonnes `columns` sont
+        téléchargées, comme dans GoogleSheetsManager.read_many.
+
+        Args:
+            sheet_id (str): ID du classeur Google Sheets
+            worksheet_name (str): Nom de la feuille (ou plage A1)
+            columns (list): Colonnes à lire (toutes par défaut)
+            header (tuple): (index, en-tête) de la feuille, voir get_headers
+
+        Returns:
+            pd.DataFrame: Données de la feuille
+        """
+        schema = schema_for(worksheet_name)
+        blocks = column_blocks(header[1], columns) if header and columns else ()
+        if not blocks:
+            values = (await self.get_values(sheet_id, [worksheet_name]))[worksheet_name]
+            return parse_values(values, schema, first_row=range_start_row(worksheet_name))
+
+        ranges = block_ranges(worksheet_name, blocks)
+        block_values = await self.get_values(sheet_id, ranges)
+        values = stitch_blocks(blocks, [block_values[name] for name in ranges])
+        header_idx = header[0]
+        if not header_matches(values, header_idx, header[1], blocks):
+            # Colonnes déplacées depuis la lecture de l'en-tête : il est recherché dans les valeurs
+            header_idx = None
+        return parse_values(values, schema, header_idx=header_idx)
+
+    async def read_many(self, sheet_id, worksheet_names, columns=None):
+        """
+        Lit plusieurs feuilles en parallèle, une requête par feuille ; les erreurs sont levées.
+
+        Les en-têtes des feuilles projetées sont lus d'abord, en un seul batchGet.
+
+        Args:
+            sheet_id (str): ID du classeur Google Sheets
+            worksheet_names (list): Noms des feuilles (ou plages A1)
+            columns (dict): Colonnes à lire par feuille {feuille: [colonnes]}
+
+        Returns:
+            dict: {feuille: DataFrame}
+        """
+        columns = columns or {}
+        headers = await self.get_headers(sheet_id, [name for name in worksheet_names if name in columns])
+        frames = await asyncio.gather(
+            *(self.read_data(sheet_id, name, columns.get(name), headers.get(name)) for name in worksheet_names)
+        )
+        return dict(zip(worksheet_names, frames))
+
+    async def get_data(self, sheet_id, worksheet_name, columns=None):
+        """
+        Récupère les données d'une feuille (mêmes conventions que GoogleSheetsManager.get_data).
+
+        Returns:
+            pd.DataFrame: Données de la feuille (vide en cas d'erreur)
+        """
+        return (await self.get_many(sheet_id, [worksheet_name], {worksheet_name: columns} if columns else None))[worksheet_name]
+
+    async def get_many(self, sheet_id, worksheet_names, columns=None):
+        """
+        Lit plusieurs feuilles en parallèle (voir read_many).
+
+        Returns:
+            dict: {feuille: DataFrame} (DataFrames vides en cas d'erreur)
+        """
+        try:
+            return await self.read_many(sheet_id, worksheet_names, columns)
+        except Exception as e:
+            print(f"Erreur lors de la lecture de {', '.join(worksheet_names)}: {e}")
+            return {name: pd.DataFrame() for name in worksheet_names}
+
+    # Façade synchrone
+
+    def run(self, coro, timeout=None):
+        """Exécute une coroutine dans la boucle de fond et retourne son résultat."""
+        return _loop_thread.run(coro, timeout)
+
+    def gather(self, *coros, timeout=None):
+        """Attend plusieurs coroutines ensemble ; retourne leurs résultats dans l'ordre."""
+        return self.run(_gather(*coros), timeout)
+
+
+# Gestionnaire asynchrone partagé par tout le processus
+async_sheets = AsyncGoogleSheetsManager()
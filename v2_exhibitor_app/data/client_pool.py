@@ -0,0 +1,76 @@
+import threading
+from datetime import datetime, timedelta
+
+import gspread
+import streamlit as st
+from google.auth.transport.requests import Request
+from google.oauth2.service_account import Credentials
+from requests.adapters import HTTPAdapter
+
+from data.quota import QuotaHTTPClient
+
+# Scopes nécessaires pour l'API (Sheets pour les données, Drive pour la sonde de fraîcheur)
+SCOPES = [
+    'https://www.googleapis.com/auth/spreadsheets',
+    'https://www.googleapis.com/auth/drive'
+]
+
+
+class ClientPool:
+    """
+    Client gspread autorisé, partagé par tout le processus.
+
+    Le compte de service est authentifié une seule fois ; le jeton est rafraîchi
+    avant son expiration (sous verrou, par un seul thread) au lieu d'être échangé
+    à chaque écriture. La session HTTP sous-jacente garde un pool de connexions
+    assez grand pour les appels concurrents, et chaque requête respecte le quota
+    du compte de service (voir data.quota).
+
+    Args:
+        scopes (list): Scopes OAuth demandés
+        refresh_margin (int): Secondes avant expiration à partir desquelles le jeton est rafraîchi
+        pool_size (int): Nombre maximal de connexions HTTP ouvertes en parallèle
+    """
+
+    def __init__(self, scopes=SCOPES, refresh_margin=300, pool_size=16):
+        self.scopes = scopes
+        self.refresh_margin = timedelta(seconds=refresh_margin)
+        self.pool_size = pool_size
+        self._lock = threading.Lock()
+        self._credentials = None
+        self._client = None
+
+    def _authorize(self):
+        self._credentials = Credentials.from_service_account_info(
+            st.secrets["gcp_service_account"],
+            scopes=self.scopes
+        )
+        # Toutes les requêtes du client passent par l'ordonnanceur de quota
+        self._client = gspread.authorize(self._credentials, http_client=QuotaHTTPClient)
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        self._client.http_client.session.mount("https://", adapter)
+
+    def _expiring(self):
+        credentials = self._credentials
+        if not credentials.token or credentials.expiry is None:
+            return True
+        # `expiry` est une date UTC naïve (convention google-auth)
+        return credentials.expiry - self.refresh_margin <= datetime.utcnow()
+
+    def get(self):
+        """Retourne le client partagé, avec un jeton valide pour au moins `refresh_margin`."""
+        with self._lock:
+            if self._client is None:
+                self._authorize()
+            if self._expiring():
+                self._credentials.refresh(Request())
+            return self._client
+
+    def token(self):
+        """Jeton d'accès valide, pour les clients HTTP qui ne passent pas par gspread."""
+        self.get()
+        return self._credentials.token
+
+
+# Pool partagé par GoogleSheetsManager et les opérations directes
+client_pool = ClientPool()
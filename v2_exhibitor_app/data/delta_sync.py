@@ -0,0 +1,138 @@
+import threading
+import time
+
+from gspread.utils import absolute_range_name
+
+from data.ranges import block_ranges, column_letter, stitch_blocks
+
+
+def _row_key(row):
+    """Empreinte d'une ligne, insensible aux cellules vides en fin de ligne."""
+    row = list(row)
+    while row and row[-1] == "":
+        row.pop()
+    return tuple(row)
+
+
+class AppendOnlySync:
+    """
+    Synchronisation incrémentale d'une feuille alimentée uniquement par append_row.
+
+    Après une lecture complète, chaque rafraîchissement ne demande que :
+    l'en-tête, la dernière ligne déjà connue et la queue ajoutée depuis.
+    Si l'en-tête ou la dernière ligne connue ne correspondent plus (suppression,
+    modification, insertion), une relecture complète est demandée. Les modifications
+    de lignes intermédiaires faites hors de ce processus sont signalées par la sonde
+    de version, qui appelle invalidate_sync (voir SnapshotService) ; une relecture
+    complète est de toute façon forcée après `full_resync_interval` secondes.
+
+    Args:
+        worksheet_name (str): Nom de la feuille
+        blocks (tuple): Blocs de colonnes lus (voir data.ranges.column_blocks), None pour toutes
+        header_rows (int): Nombre de lignes d'en-tête vérifiées (titre + en-tête)
+        full_resync_interval (float): Délai maximal entre deux lectures complètes
+    """
+
+    def __init__(self, worksheet_name, blocks=None, header_rows=2, full_resync_interval=600):
+        self.worksheet_name = worksheet_name
+        self.blocks = blocks
+        self.header_rows = header_rows
+        self.full_resync_interval = full_resync_interval
+        self.lock = threading.Lock()
+        self.values = None
+        self.last_full_sync = 0.0
+
+    @property
+    def row_count(self):
+        """Nombre de lignes synchronisées (0 avant la première lecture complète)."""
+        return len(self.values) if self.values is not None else 0
+
+    def needs_full_sync(self):
+        return (
+            self.values is None
+            or self.row_count <= self.header_rows
+            or time.monotonic() - self.last_full_sync > self.full_resync_interval
+        )
+
+    def invalidate(self):
+        """Force une relecture complète au prochain rafraîchissement."""
+        self.values = None
+
+    def _ranges(self, first_row, last_row=None):
+        if self.blocks:
+            return block_ranges(self.worksheet_name, self.blocks, first_row, last_row)
+        if last_row is not None:
+            return [absolute_range_name(self.worksheet_name, f"{first_row}:{last_row}")]
+        width = max((len(row) for row in self.values), default=1)
+        return [absolute_range_name(self.worksheet_name, f"A{first_row}:{column_letter(max(width, 1))}")]
+
+    def full_ranges(self):
+        """Plages A1 d'une lecture complète (feuille entière ou blocs de colonnes)."""
+        if self.blocks:
+            return block_ranges(self.worksheet_name, self.blocks)
+        return [absolute_range_name(self.worksheet_name)]
+
+    def ranges(self):
+        """Plages A1 à demander pour ce rafraîchissement (sonde + queue, ou lecture complète)."""
+        if self.needs_full_sync():
+            return self.full_ranges()
+        n = self.row_count
+        return self._ranges(1, self.header_rows) + self._ranges(n, n) + self._ranges(n + 1)
+
+    def _stitch(self, value_ranges):
+        if self.blocks:
+            return stitch_blocks(self.blocks, [value_range.get("values", []) for value_range in value_ranges])
+        return value_ranges[0].get("values", []) if value_ranges else []
+
+    def apply(self, value_ranges):
+        """
+        Intègre la réponse batchGet correspondant à `ranges()`.
+
+        Returns:
+            list: Valeurs complètes de la feuille, ou None si une relecture complète
+                est nécessaire (en-tête ou dernière ligne modifiés).
+        """
+        per_part = len(self.blocks) if self.blocks else 1
+        responses = [
+            self._stitch(value_ranges[start:start + per_part])
+            for start in range(0, len(value_ranges), per_part)
+        ]
+        if len(responses) == 1:
+            self.values = responses[0]
+            self.last_full_sync = time.monotonic()
+            return self.values
+
+        head, last, tail = responses
+        known_head = self.values[:self.header_rows]
+        if [_row_key(row) for row in head] != [_row_key(row) for row in known_head]:
+            self.invalidate()
+            return None
+        if _row_key(last[0] if last else []) != _row_key(self.values[-1]):
+            self.invalidate()
+            return None
+
+        if tail:
+            # Nouvelle liste : les instantanés déjà publiés ne sont jamais modifiés
+            self.values = self.values + tail
+        return self.values
+
+
+_states = {}
+_states_lock = threading.Lock()
+
+
+def get_sync(sheet_id, worksheet_name, blocks=None):
+    """Retourne l'état de synchronisation partagé d'une feuille et d'une projection (créé au besoin)."""
+    with _states_lock:
+        key = (sheet_id, worksheet_name, blocks)
+        if key not in _states:
+            _states[key] = AppendOnlySync(worksheet_name, blocks)
+        return _states[key]
+
+
+def invalidate_sync(sheet_id, worksheet_name=None):
+    """Force une relecture complète d'une feuille (ou de tout le classeur) après une écriture."""
+    with _states_lock:
+        for (state_sheet_id, state_name, _blocks), state in _states.items():
+            if state_sheet_id == sheet_id and worksheet_name in (None, state_name):
+                state.invalidate()
@@ -1,62 +1,83 @@
-import gspread
-from google.oauth2.service_account import Credentials
 from datetime import datetime
+from functools import partial
 import streamlit as st
 
-def direct_add_order(sheet_id, order_data):
+from data.fanout import failures, fan_out
+from data.row_index import new_order_id
+from data.test_data_manager import GoogleSheetsManager
+from data.write_queue import order_queue
+
+def _order_row(order_data, now):
+    """Construit la ligne d'une commande, dans l'ordre des colonnes de "Orders"."""
+    return [
+        order_data.get('Booth #', ''),
+        order_data.get('Section', ''),
+        order_data.get('Exhibitor Name', ''),
+        order_data.get('Item', ''),
+        order_data.get('Color', ''),
+        order_data.get('Quantity', ''),
+        now.strftime("%m/%d/%Y"),  # Date
+        now.strftime("%I:%M:%S %p"),  # Heure
+        order_data.get('Status', 'New'),
+        order_data.get('Type', 'New Order'),
+        order_data.get('Boomers Quantity', ''),
+        order_data.get('Comments', ''),
+        order_data.get('User', ''),
+        order_data.get('Order ID') or new_order_id()  # Attribué une fois : rejouer la ligne garde le même ID
+    ]
+
+
+def _order_targets(orders, rows):
+    """Regroupe les lignes par feuille cible : "Orders" reçoit tout, chaque section sa part."""
+    targets = {"Orders": list(rows)}
+    for order_data, row_data in zip(orders, rows):
+        section = order_data.get('Section', '')
+        if section and section != "Orders":
+            targets.setdefault(section, []).append(row_data)
+    return targets
+
+
+def direct_add_orders(sheet_id, orders):
     """
-    Fonction indépendante qui utilise directement l'approche fonctionnelle 
-    pour ajouter une commande à Google Sheets.
+    Ajoute plusieurs commandes (un panier) avec un seul append_rows par feuille
+    cible : "Orders" puis chaque feuille de section concernée.
+    
+    Args:
+        sheet_id (str): ID du classeur Google Sheets
+        orders (list): Commandes (dictionnaires colonne -> valeur)
+        
+    Returns:
+        bool: True si l'ajout dans "Orders" a réussi, False sinon
     """
+    if not orders:
+        return False
     try:
-        # Approche directe qui fonctionne
-        scope = ["https://www.googleapis.com/auth/spreadsheets"]
-        # creds = Credentials.from_service_account_file(
-        #     r"S:\Work (Souhail)\Archive\\new_cloud_key\gestion-exposants-32fb1e27b63a.json", 
-        #     scopes=scope
-        # )
-        creds = Credentials.from_service_account_info(
-            st.secrets["gcp_service_account"], 
-            scopes=scope
-        )
-        
-        gc = gspread.authorize(creds)
-        sh = gc.open_by_key(sheet_id)
-        orders_sheet = sh.worksheet("Orders")
+        # Client partagé (pool) et handles en cache : seuls les ajouts touchent l'API
+        gs_manager = GoogleSheetsManager()
         
-        # Préparer les données
+        # Toutes les lignes partagent la même date et heure
         now = datetime.now()
+        rows = [_order_row(order_data, now) for order_data in orders]
         
-        # Créer la ligne de données
-        row_data = [
-            order_data.get('Booth #', ''),
-            order_data.get('Section', ''),
-            order_data.get('Exhibitor Name', ''),
-            order_data.get('Item', ''),
-            order_data.get('Color', ''),
-            order_data.get('Quantity', ''),
-            now.strftime("%m/%d/%Y"),  # Date
-            now.strftime("%I:%M:%S %p"),  # Heure
-            order_data.get('Status', 'New'),
-            order_data.get('Type', 'New Order'),
-            order_data.get('Boomers Quantity', ''),
-            order_data.get('Comments', ''),
-            order_data.get('User', '')
-        ]
+        targets = _order_targets(orders, rows)
         
-        # Insérer la nouvelle ligne
-        orders_sheet.append_row(row_data)
-        st.success("Commande ajoutée avec succès!")
+        # Un seul append_rows par feuille, toutes les feuilles en parallèle
+        results = fan_out({
+            worksheet: partial(gs_manager.append_order_rows, sheet_id, worksheet, target_rows)
+            for worksheet, target_rows in targets.items()
+        })
         
-        # Mettre à jour la feuille de section si elle existe
-        section = order_data.get('Section', '')
-        if section:
-            try:
-                section_sheet = sh.worksheet(section)
-                section_sheet.append_row(row_data)
-            except Exception:
-                # La feuille n'existe pas ou autre erreur - on ignore
-                pass
+        errors = failures(results)
+        if "Orders" in errors:
+            written = [worksheet for worksheet, result in results.items() if result.ok]
+            if written:
+                st.warning(f"La commande a tout de même été ajoutée à: {', '.join(written)}")
+            raise errors.pop("Orders")
+        st.success("Commande ajoutée avec succès!" if len(rows) == 1
+                   else f"{len(rows)} commandes ajoutées avec succès!")
+        for worksheet, error in errors.items():
+            st.warning(f"Commande enregistrée, mais la feuille de section '{worksheet}' n'a pas été mise à jour: {error}")
+            print(f"Erreur lors de l'ajout dans la section {worksheet}: {error}")
         
         return True
     except Exception as e:
@@ -65,10 +86,48 @@ def direct_add_order(sheet_id, order_data):
         return False
 
 
-def direct_delete_order(sheet_id, booth_num, item_name, color, section):
+def queue_orders(sheet_id, orders, key):
+    """
+    Journalise des commandes dans la file d'écriture durable ; l'envoi vers
+    Google Sheets se fait en arrière-plan (voir data.write_queue).
+    
+    Args:
+        sheet_id (str): ID du classeur Google Sheets
+        orders (list): Commandes (dictionnaires colonne -> valeur)
+        key (str): Clé d'idempotence de la soumission (ex. un panier)
+        
+    Returns:
+        int: Nombre de lignes journalisées (0 si la soumission l'était déjà)
+    """
+    now = datetime.now()
+    rows = [_order_row(order_data, now) for order_data in orders]
+    
+    # Une entrée par (ligne, feuille) : un échec sur une section ne renvoie pas "Orders"
+    entries = []
+    for position, (order_data, row_data) in enumerate(zip(orders, rows)):
+        worksheets = ["Orders"]
+        section = order_data.get('Section', '')
+        if section and section != "Orders":
+            worksheets.append(section)
+        entries.extend((f"{key}:{position}:{worksheet}", worksheet, row_data) for worksheet in worksheets)
+    booth = orders[0].get('Booth #') if orders else None
+    return order_queue.enqueue(sheet_id, entries, booth=booth)
+
+
+def direct_add_order(sheet_id, order_data):
+    """
+    Fonction indépendante qui utilise directement l'approche fonctionnelle 
+    pour ajouter une commande à Google Sheets.
+    """
+    return direct_add_orders(sheet_id, [order_data])
+
+
+def direct_delete_order(sheet_id, booth_num, item_name, color, section, order_id=None):
     """
     Fonction pour supprimer une commande de Google Sheets basée sur le numéro de stand, 
-    l'article et la couleur. Gère les feuilles avec des cellules vides dans l'en-tête.
+    l'article et la couleur. Les lignes sont localisées par l'index des commandes
+    (vérifié par une lecture ciblée) ; la feuille de section n'est modifiée
+    qu'après la suppression effective dans "Orders".
     
     Args:
         sheet_id (str): ID du classeur Google Sheets
@@ -76,100 +135,33 @@ def direct_delete_order(sheet_id, booth_num, item_name, color, section):
         item_name (str): Nom de l'article
         color (str): Couleur de l'article
         section (str): Section de l'exposant
+        order_id (str): Order ID de la commande (prioritaire sur stand/article/couleur)
         
     Returns:
-        bool: True si la suppression a réussi, False sinon
+        bool: True si la suppression a réussi dans "Orders", False sinon
     """
-    try:
-        # Configurer l'accès à l'API
-        scope = ["https://www.googleapis.com/auth/spreadsheets"]
-        # creds = Credentials.from_service_account_file(
-        #     # "S:\\Work (Souhail)\\Archive\\Dashboard Web\\gestion-exposants-eb6f7767a2ad.json", 
-        #     scopes=scope
-        # )
-        creds = Credentials.from_service_account_info(
-            st.secrets["gcp_service_account"], 
-            scopes=scope
-        )
-        gc = gspread.authorize(creds)
-        sh = gc.open_by_key(sheet_id)
-        
-        # Supprimer de la feuille principale "Orders"
-        orders_sheet = sh.worksheet("Orders")
-        
-        # Obtenir toutes les valeurs (y compris l'en-tête)
-        all_values = orders_sheet.get_all_values()
-        if not all_values:
-            return False
-        
-        # Extraire l'en-tête
-        headers = all_values[0]
-        
-        # Trouver les index des colonnes nécessaires
-        try:
-            booth_idx = headers.index('Booth #')
-            item_idx = headers.index('Item')
-            color_idx = headers.index('Color')
-        except ValueError:
-            # Essayer une approche plus générique si les en-têtes exacts ne sont pas trouvés
-            booth_idx = next((i for i, h in enumerate(headers) if 'booth' in h.lower()), 0)
-            item_idx = next((i for i, h in enumerate(headers) if 'item' in h.lower()), 3)
-            color_idx = next((i for i, h in enumerate(headers) if 'color' in h.lower()), 4)
-        
-        # Trouver la ligne à supprimer
-        row_to_delete = None
-        for i, row in enumerate(all_values[1:], 2):  # Start from row 2 (1-indexed)
-            if (len(row) > max(booth_idx, item_idx, color_idx) and
-                str(row[booth_idx]).strip() == str(booth_num).strip() and
-                row[item_idx].strip() == item_name.strip() and
-                row[color_idx].strip() == color.strip()):
-                row_to_delete = i
-                break
-        
-        # Supprimer la ligne si trouvée
-        if row_to_delete:
-            orders_sheet.delete_rows(row_to_delete)
-            
-            # Tenter de supprimer également de la feuille de section si elle existe
-            if section:
-                try:
-                    section_sheet = sh.worksheet(section)
-                    section_values = section_sheet.get_all_values()
-                    
-                    if section_values:
-                        section_headers = section_values[0]
-                        
-                        # Trouver les index dans la feuille de section
-                        try:
-                            s_booth_idx = section_headers.index('Booth #')
-                            s_item_idx = section_headers.index('Item')
-                            s_color_idx = section_headers.index('Color')
-                        except ValueError:
-                            s_booth_idx = booth_idx
-                            s_item_idx = item_idx
-                            s_color_idx = color_idx
-                        
-                        # Trouver la ligne à supprimer dans la section
-                        section_row_to_delete = None
-                        for s_i, s_row in enumerate(section_values[1:], 2):  # Start from row 2 (1-indexed)
-                            if (len(s_row) > max(s_booth_idx, s_item_idx, s_color_idx) and
-                                str(s_row[s_booth_idx]).strip() == str(booth_num).strip() and
-                                s_row[s_item_idx].strip() == item_name.strip() and
-                                s_row[s_color_idx].strip() == color.strip()):
-                                section_row_to_delete = s_i
-                                break
-                        
-                        if section_row_to_delete:
-                            section_sheet.delete_rows(section_row_to_delete)
-                
-                except Exception as section_error:
-                    print(f"Erreur lors de la suppression dans la section: {section_error}")
-            
-            return True
-        
-        return False  # Ligne non trouvée
+    # Client partagé (pool) et handles en cache
+    gs_manager = GoogleSheetsManager()
     
+    try:
+        deleted = gs_manager._delete_order_row(sheet_id, "Orders", booth_num, item_name, color, order_id)
     except Exception as e:
+        gs_manager._forget_handles(sheet_id, e)
         st.error(f"Erreur lors de la suppression de la commande: {e}")
         print(f"Détails de l'erreur: {e}")  # Pour le débogage
         return False
+    
+    # Commande absente de "Orders" : la feuille de section n'est pas touchée
+    if not deleted or not section or section == "Orders":
+        return deleted
+    
+    try:
+        if not gs_manager._delete_order_row(sheet_id, section, booth_num, item_name, color, order_id):
+            st.warning(f"Les feuilles 'Orders' et '{section}' ne sont plus synchronisées pour cette commande.")
+    except Exception as e:
+        # Échec partiel : signalé plutôt qu'ignoré
+        gs_manager._forget_handles(sheet_id, e)
+        st.warning(f"La feuille de section '{section}' n'a pas été mise à jour: {e}")
+        print(f"Erreur lors de la suppression dans la section {section}: {e}")
+    
+    return True
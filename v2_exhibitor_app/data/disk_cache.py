@@ -0,0 +1,138 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+# Dossier du cache disque (modifiable par variable d'environnement)
+CACHE_DIR = os.environ.get(
+    "EXHIBITOR_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "v2_exhibitor_app"),
+)
+
+
+class SnapshotStore:
+    """
+    Cache disque (SQLite) des DataFrames lus dans Google Sheets.
+
+    Chaque entrée est identifiée par (sheet_id, feuille, projection, version), où
+    la projection est une empreinte des colonnes lues et du schéma : un instantané
+    n'est jamais servi à une lecture qui attend d'autres colonnes. Seules les
+    `keep_versions` dernières versions de chaque feuille sont conservées. Le cache
+    permet de servir des données dès le redémarrage du serveur, sans attendre l'API.
+
+    Args:
+        path (str): Fichier SQLite (par défaut CACHE_DIR/snapshots.sqlite3)
+        keep_versions (int): Nombre de versions conservées par feuille
+    """
+
+    def __init__(self, path=None, keep_versions=2):
+        self.path = path or os.path.join(CACHE_DIR, "snapshots.sqlite3")
+        self.keep_versions = keep_versions
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def _connect(self):
+        if not self._ready:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=10)
+        if not self._ready:
+            with self._lock:
+                connection.execute("PRAGMA journal_mode=WAL")
+                # Cache créé avant la colonne de projection : son contenu n'est plus identifiable
+                columns = {row[1] for row in connection.execute("PRAGMA table_info(snapshots)")}
+                if columns and "projection" not in columns:
+                    connection.execute("DROP TABLE snapshots")
+                connection.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS snapshots (
+                        sheet_id TEXT NOT NULL,
+                        worksheet TEXT NOT NULL,
+                        projection TEXT NOT NULL,
+                        version TEXT NOT NULL,
+                        saved_at REAL NOT NULL,
+                        frame BLOB NOT NULL,
+                        PRIMARY KEY (sheet_id, worksheet, projection, version)
+                    )
+                    """
+                )
+                self._ready = True
+        return connection
+
+    def save(self, sheet_id, version, frames, projections=None):
+        """
+        Enregistre les DataFrames {feuille: df} d'une version du classeur.
+
+        Args:
+            projections (dict): Empreinte de projection par feuille ("" si absente)
+        """
+        projections = projections or {}
+        now = time.time()
+        rows = [
+            (sheet_id, worksheet, projections.get(worksheet, ""), version, now,
+             pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL))
+            for worksheet, df in frames.items()
+        ]
+        with closing(self._connect()) as connection, connection:
+            connection.executemany(
+                """
+                INSERT OR REPLACE INTO snapshots (sheet_id, worksheet, projection, version, saved_at, frame)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            for worksheet in frames:
+                connection.execute(
+                    """
+                    DELETE FROM snapshots
+                    WHERE sheet_id = ? AND worksheet = ? AND version NOT IN (
+                        SELECT version FROM snapshots WHERE sheet_id = ? AND worksheet = ?
+                        ORDER BY saved_at DESC LIMIT ?
+                    )
+                    """,
+                    (sheet_id, worksheet, sheet_id, worksheet, self.keep_versions),
+                )
+
+    def load(self, sheet_id, worksheets, version=None, projections=None):
+        """
+        Charge les DataFrames des feuilles demandées.
+
+        Args:
+            sheet_id (str): ID du classeur Google Sheets
+            worksheets (list): Feuilles qui doivent toutes être présentes
+            version (str): Version exacte voulue ; None pour la plus récente complète
+            projections (dict): Empreinte de projection attendue par feuille ("" si absente)
+
+        Returns:
+            tuple: (version, {feuille: df}), ou (None, None) si rien ne correspond
+        """
+        worksheets = list(dict.fromkeys(worksheets))
+        projections = projections or {}
+        matches = " OR ".join("(worksheet = ? AND projection = ?)" for _ in worksheets)
+        match_params = [value for worksheet in worksheets for value in (worksheet, projections.get(worksheet, ""))]
+        with closing(self._connect()) as connection, connection:
+            if version is None:
+                row = connection.execute(
+                    f"""
+                    SELECT version FROM snapshots
+                    WHERE sheet_id = ? AND ({matches})
+                    GROUP BY version HAVING COUNT(DISTINCT worksheet) = ?
+                    ORDER BY MAX(saved_at) DESC LIMIT 1
+                    """,
+                    (sheet_id, *match_params, len(worksheets)),
+                ).fetchone()
+                if row is None:
+                    return None, None
+                version = row[0]
+            rows = connection.execute(
+                f"SELECT worksheet, frame FROM snapshots WHERE sheet_id = ? AND version = ? AND ({matches})",
+                (sheet_id, version, *match_params),
+            ).fetchall()
+        if len(rows) != len(worksheets):
+            return None, None
+        return version, {worksheet: pickle.loads(frame) for worksheet, frame in rows}
+
+
+# Cache disque partagé par tout le processus
+snapshot_store = SnapshotStore()
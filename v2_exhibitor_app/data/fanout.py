@@ -0,0 +1,42 @@
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# Nombre maximal d'écritures envoyées en parallèle par le processus
+MAX_WORKERS = 8
+
+# Résultat d'une écriture : ok, valeur retournée, exception éventuelle
+WriteResult = namedtuple("WriteResult", ["ok", "value", "error"])
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="sheets-write")
+
+
+def _run(task):
+    try:
+        return WriteResult(True, task(), None)
+    except Exception as e:
+        return WriteResult(False, None, e)
+
+
+def fan_out(tasks):
+    """
+    Exécute des écritures indépendantes en parallèle sur un pool borné.
+
+    Les tâches ne doivent pas appeler Streamlit (elles tournent hors du script) ;
+    l'appelant affiche les résultats une fois toutes les tâches terminées.
+
+    Args:
+        tasks (dict): Cible (ex. nom de feuille) -> fonction sans argument
+
+    Returns:
+        dict: Cible -> WriteResult, dans l'ordre des tâches
+    """
+    if len(tasks) == 1:
+        # Pas de détour par le pool pour une seule écriture
+        return {target: _run(task) for target, task in tasks.items()}
+    futures = {target: _executor.submit(_run, task) for target, task in tasks.items()}
+    return {target: future.result() for target, future in futures.items()}
+
+
+def failures(results):
+    """Cibles en échec : {cible: exception}."""
+    return {target: result.error for target, result in results.items() if not result.ok}
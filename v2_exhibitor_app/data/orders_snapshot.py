@@ -0,0 +1,63 @@
+import pandas as pd
+
+from data.row_index import normalize_cell
+
+
+class OrdersSnapshot:
+    """
+    Instantané immuable de la feuille "Orders", partagé par toutes les sessions.
+
+    La feuille est téléchargée une seule fois par cycle de rafraîchissement ;
+    l'index stand -> positions de lignes est construit à ce moment-là, ce qui
+    permet d'extraire les commandes d'un stand en O(k) au lieu de refiltrer
+    tout le DataFrame.
+
+    Le DataFrame ne doit pas être modifié après construction.
+    """
+
+    def __init__(self, orders_df):
+        self.df = orders_df if orders_df is not None else pd.DataFrame()
+        self.booth_index = self._build_booth_index(self.df)
+        self.exhibitor_names = self._build_exhibitor_names(self.df)
+
+    @staticmethod
+    def _build_booth_index(orders_df):
+        """Construit le dictionnaire stand -> positions (iloc) des lignes."""
+        if orders_df.empty or "Booth #" not in orders_df.columns:
+            return {}
+        booths = orders_df["Booth #"].map(normalize_cell)
+        return {
+            booth: positions
+            for booth, positions in booths.groupby(booths, sort=False).indices.items()
+            if booth
+        }
+
+    @staticmethod
+    def _build_exhibitor_names(orders_df):
+        """Construit le dictionnaire stand -> nom d'exposant (premier nom non vide)."""
+        if orders_df.empty or "Booth #" not in orders_df.columns or "Exhibitor Name" not in orders_df.columns:
+            return {}
+        names = {}
+        for booth, name in zip(orders_df["Booth #"], orders_df["Exhibitor Name"]):
+            booth = normalize_cell(booth)
+            if not booth or booth in names or name is None or pd.isna(name):
+                continue
+            name = str(name).strip()
+            if name:
+                names[booth] = name
+        return names
+
+    @property
+    def empty(self):
+        return self.df.empty
+
+    def booth_orders(self, booth_number):
+        """Retourne les commandes d'un stand (DataFrame éventuellement vide)."""
+        positions = self.booth_index.get(normalize_cell(booth_number))
+        if positions is None:
+            return self.df.iloc[0:0]
+        return self.df.iloc[positions]
+
+    def exhibitor_name(self, booth_number, default=None):
+        """Retourne le nom de l'exposant d'un stand, ou `default` s'il est inconnu."""
+        return self.exhibitor_names.get(normalize_cell(booth_number), default)
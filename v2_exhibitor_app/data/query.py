@@ -0,0 +1,179 @@
+import csv
+import io
+import threading
+import time
+
+from data.ranges import column_letter
+from data.row_index import normalize_cell
+from data.schemas import parse_values, schema_for
+
+# Point d'accès Google Visualization (langage de requête des feuilles Google Sheets)
+GVIZ_URL = "https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq"
+
+
+def _select(df, columns):
+    if not columns:
+        return df
+    return df[[column for column in columns if column in df.columns]]
+
+
+class QueryBackend:
+    """
+    Interface des moteurs de requête utilisés par GoogleSheetsManager.query.
+
+    Un moteur reçoit le gestionnaire (pour ses handles, en-têtes et client),
+    la feuille, un filtre d'égalité {colonne: valeur} et les colonnes à retourner.
+    """
+
+    def run(self, manager, sheet_id, worksheet, where, columns=None):
+        raise NotImplementedError
+
+
+class SheetsQueryBackend(QueryBackend):
+    """
+    Pousse le filtre vers Google Sheets via le point d'accès de requête (gviz/tq).
+
+    Seules les lignes qui correspondent au filtre sont téléchargées. `base_url` et
+    `session` permettent de viser un serveur local de substitution.
+
+    Args:
+        base_url (str): Modèle d'URL du point d'accès ({sheet_id} est remplacé)
+        session: Session HTTP authentifiée ; par défaut celle du client gspread
+        timeout (float): Délai maximal d'une requête, en secondes
+    """
+
+    def __init__(self, base_url=GVIZ_URL, session=None, timeout=30):
+        self.base_url = base_url
+        self.session = session
+        self.timeout = timeout
+
+    @staticmethod
+    def _literal(value):
+        value = normalize_cell(value)
+        try:
+            float(value)
+            return value
+        except ValueError:
+            return "'{}'".format(value.replace("'", "\\'"))
+
+    def build_query(self, header, where, columns=None):
+        """Traduit le filtre en requête gviz ("select A, D where A = 108")."""
+        letters = {name: column_letter(idx + 1) for idx, name in enumerate(header) if name}
+        selected = [letters[name] for name in (columns or []) if name in letters]
+        query = "select " + (", ".join(selected) if selected else "*")
+        conditions = []
+        for column, value in where.items():
+            if column not in letters:
+                raise KeyError(f"Colonne inconnue: {column}")
+            conditions.append(f"{letters[column]} = {self._literal(value)}")
+        if conditions:
+            query += " where " + " and ".join(conditions)
+        return query
+
+    def run(self, manager, sheet_id, worksheet, where, columns=None):
+        header_idx, header = manager._load_headers(sheet_id, [worksheet])[worksheet]
+        session = self.session or manager.client.http_client.session
+        response = session.get(
+            self.base_url.format(sheet_id=sheet_id),
+            params={
+                "sheet": worksheet,
+                "range": f"A{header_idx + 1}:{column_letter(max(len(header), 1))}",
+                "headers": 1,
+                "tqx": "out:csv",
+                "tq": self.build_query(header, where, columns),
+            },
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        values = list(csv.reader(io.StringIO(response.text)))
+        # Les numéros de ligne de la feuille ne sont pas renvoyés par ce point d'accès
+        return parse_values(values, schema_for(worksheet), header_idx=0).reset_index(drop=True)
+
+
+class IndexedQueryBackend(QueryBackend):
+    """
+    Évalue le filtre en mémoire, à partir d'index colonne -> positions des lignes.
+
+    La feuille est relue uniquement quand sa version (GoogleSheetsManager.get_version)
+    change ; les index sont construits à la première requête sur une colonne puis
+    réutilisés jusqu'à la version suivante. La version sondée est elle-même
+    réutilisée pendant `probe_interval` secondes, sauf après une écriture de ce
+    processus (voir expire_probe).
+
+    Args:
+        max_age (float): Âge maximal des données si la sonde de version est indisponible
+        probe_interval (float): Durée de validité d'une sonde de version, en secondes
+    """
+
+    def __init__(self, max_age=120, probe_interval=10):
+        self.max_age = max_age
+        self.probe_interval = probe_interval
+        self._entries = {}
+        self._probes = {}
+        self._lock = threading.Lock()
+
+    def _version(self, manager, sheet_id):
+        """Version du classeur, sondée au plus une fois par `probe_interval` secondes."""
+        with self._lock:
+            probe = self._probes.get(sheet_id)
+        if probe is not None and time.monotonic() - probe[1] < self.probe_interval:
+            return probe[0]
+        version = manager.get_version(sheet_id)
+        with self._lock:
+            self._probes[sheet_id] = (version, time.monotonic())
+        return version
+
+    def expire_probe(self, sheet_id):
+        """Force une nouvelle sonde à la prochaine requête (écriture faite par ce processus)."""
+        with self._lock:
+            self._probes.pop(sheet_id, None)
+
+    def _entry(self, manager, sheet_id, worksheet):
+        version = self._version(manager, sheet_id)
+        with self._lock:
+            entry = self._entries.get((sheet_id, worksheet))
+            if entry is not None:
+                if version is not None and entry["version"] == version:
+                    return entry
+                if version is None and time.monotonic() - entry["loaded_at"] < self.max_age:
+                    return entry
+
+        # read_many lève en cas d'erreur : une lecture en échec n'est jamais mise en cache
+        entry = {
+            "version": version,
+            "loaded_at": time.monotonic(),
+            "df": manager.read_many(sheet_id, [worksheet])[worksheet],
+            "indexes": {},
+        }
+        with self._lock:
+            self._entries[(sheet_id, worksheet)] = entry
+        return entry
+
+    @staticmethod
+    def _index(entry, column):
+        index = entry["indexes"].get(column)
+        if index is None:
+            keys = entry["df"][column].map(normalize_cell)
+            index = keys.groupby(keys, sort=False).indices
+            entry["indexes"][column] = index
+        return index
+
+    def run(self, manager, sheet_id, worksheet, where, columns=None):
+        entry = self._entry(manager, sheet_id, worksheet)
+        df = entry["df"]
+        if not where:
+            return _select(df, columns)
+
+        positions = None
+        for column, value in where.items():
+            if column not in df.columns:
+                return _select(df.iloc[0:0], columns)
+            found = self._index(entry, column).get(normalize_cell(value))
+            if found is None:
+                return _select(df.iloc[0:0], columns)
+            positions = set(found) if positions is None else positions & set(found)
+        return _select(df.iloc[sorted(positions)], columns)
+
+
+# Moteur en mémoire partagé par tout le processus (utilisé par défaut et en repli)
+indexed_backend = IndexedQueryBackend()
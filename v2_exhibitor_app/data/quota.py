@@ -0,0 +1,260 @@
+import asyncio
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+from gspread.exceptions import APIError, WorksheetNotFound
+from gspread.http_client import HTTPClient
+
+# Quotas par défaut de l'API Sheets, par utilisateur (ici le compte de service) et par minute
+READ_REQUESTS_PER_MINUTE = 60
+WRITE_REQUESTS_PER_MINUTE = 60
+
+# Statuts HTTP qui signalent une surcharge passagère. Un 429 est refusé avant tout
+# traitement ; un 503 peut arriver après que la requête a été appliquée
+RETRY_STATUSES = (429, 503)
+REJECTED_STATUS = 429
+
+# Écritures rejouables sans effet de bord (valeurs écrites à des plages fixes) ;
+# values:append et le batchUpdate du classeur (suppression de lignes) ne le sont pas
+IDEMPOTENT_WRITE_SUFFIXES = ("/values:batchUpdate", "/values:batchClear", ":clear")
+
+SHEETS_API_HOST = "sheets.googleapis.com"
+
+
+class TokenBucket:
+    """
+    Seau à jetons : `burst` requêtes immédiates, puis un débit constant.
+
+    Le débit est choisi pour que `burst` + une minute de remplissage ne dépasse
+    jamais `per_minute` : aucune fenêtre glissante d'une minute ne dépasse le quota.
+    Le solde peut devenir négatif : chaque demandeur réserve son jeton et attend
+    le temps correspondant, dans l'ordre d'arrivée.
+
+    Args:
+        per_minute (int): Requêtes autorisées par minute
+        burst (int): Requêtes pouvant partir sans attendre
+    """
+
+    def __init__(self, per_minute, burst):
+        self.capacity = float(burst)
+        self.rate = max(per_minute - burst, 1) / 60.0
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, now):
+        """Réserve un jeton ; retourne l'attente nécessaire, en secondes."""
+        self._refill(now)
+        self.tokens -= 1
+        return max(0.0, -self.tokens / self.rate)
+
+    def drain(self, now):
+        """Vide le seau (après un 429 : le quota réel est déjà atteint)."""
+        self._refill(now)
+        self.tokens = min(self.tokens, 0.0)
+
+    def available(self, now):
+        self._refill(now)
+        return self.tokens
+
+
+class QuotaScheduler:
+    """
+    Ordonnanceur partagé par tout le processus pour les appels à l'API Sheets.
+
+    Chaque requête prend un jeton dans le seau de sa catégorie (lecture ou
+    écriture) ; les réponses 429 (et 503 pour les requêtes idempotentes) sont
+    réessayées avec un délai exponentiel et une gigue aléatoire, en respectant
+    l'en-tête Retry-After s'il est présent.
+
+    Args:
+        read_per_minute (int): Quota de lectures par minute
+        write_per_minute (int): Quota d'écritures par minute
+        burst (int): Requêtes immédiates autorisées par catégorie
+        max_retries (int): Nouvelles tentatives avant d'abandonner
+        base_delay (float): Premier délai de nouvelle tentative, en secondes
+        max_delay (float): Délai maximal entre deux tentatives, en secondes
+    """
+
+    def __init__(self, read_per_minute=READ_REQUESTS_PER_MINUTE, write_per_minute=WRITE_REQUESTS_PER_MINUTE,
+                 burst=15, max_retries=5, base_delay=1.0, max_delay=32.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._buckets = {
+            "read": TokenBucket(read_per_minute, burst),
+            "write": TokenBucket(write_per_minute, burst),
+        }
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._counters = {"requests": 0, "throttled": 0, "retries": 0, "failures": 0}
+
+    @staticmethod
+    def category(method, url):
+        """Catégorie de quota d'une requête (None si elle ne vise pas l'API Sheets)."""
+        if SHEETS_API_HOST not in str(url):
+            return None
+        return "read" if method.upper() == "GET" else "write"
+
+    @staticmethod
+    def idempotent(method, url):
+        """La requête peut-elle être rejouée sans risque si sa réponse est perdue ?"""
+        method = method.upper()
+        if method in ("GET", "PUT"):
+            return True
+        return method == "POST" and urlparse(str(url)).path.endswith(IDEMPOTENT_WRITE_SUFFIXES)
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _reserve(self, category):
+        with self._lock:
+            wait = self._buckets[category].reserve(time.monotonic())
+            self._counters["requests"] += 1
+            if wait > 0:
+                self._waiting += 1
+        return wait
+
+    def _done_waiting(self):
+        with self._lock:
+            self._waiting -= 1
+
+    def acquire(self, category):
+        """Bloque jusqu'à ce qu'une requête de cette catégorie puisse partir."""
+        if category is None:
+            return
+        wait = self._reserve(category)
+        if wait > 0:
+            try:
+                time.sleep(wait)
+            finally:
+                self._done_waiting()
+
+    async def acquire_async(self, category):
+        """Variante asyncio de acquire : attend sans bloquer la boucle."""
+        if category is None:
+            return
+        wait = self._reserve(category)
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            finally:
+                self._done_waiting()
+
+    def _backoff_delay(self, category, attempt, retry_after=None):
+        if category is not None:
+            with self._lock:
+                self._buckets[category].drain(time.monotonic())
+        delay = min(self.max_delay, self.base_delay * 2 ** attempt)
+        delay = random.uniform(delay / 2, delay)
+        if retry_after:
+            delay = max(delay, retry_after)
+        self._count("retries")
+        return delay
+
+    def backoff(self, category, attempt, retry_after=None):
+        """Attend avant la nouvelle tentative numéro `attempt` (à partir de 0)."""
+        time.sleep(self._backoff_delay(category, attempt, retry_after))
+
+    def _retryable(self, error, attempt, idempotent=True):
+        """Retourne le délai Retry-After (ou 0) si l'erreur doit être réessayée, None sinon."""
+        status, retry_after = _error_status(error)
+        if status not in RETRY_STATUSES:
+            return None
+        if status != REJECTED_STATUS and not idempotent:
+            # Requête peut-être déjà appliquée : la rejouer dupliquerait un ajout ou une suppression
+            return None
+        self._count("throttled")
+        if attempt == self.max_retries:
+            self._count("failures")
+            return None
+        return retry_after or 0
+
+    def call(self, method, url, send):
+        """
+        Exécute `send()` sous quota, avec nouvelles tentatives sur 429, et sur 503
+        pour les requêtes idempotentes (voir `idempotent`).
+
+        `send` lève APIError en cas d'échec (comportement du client gspread).
+        """
+        category = self.category(method, url)
+        idempotent = self.idempotent(method, url)
+        for attempt in range(self.max_retries + 1):
+            self.acquire(category)
+            try:
+                return send()
+            except Exception as error:
+                retry_after = self._retryable(error, attempt, idempotent)
+                if retry_after is None:
+                    raise
+                self.backoff(category, attempt, retry_after)
+
+    async def call_async(self, method, url, send):
+        """
+        Variante asyncio de call : `send` est une fonction coroutine qui lève
+        une erreur portant `status` (ex. aiohttp.ClientResponseError) en cas d'échec.
+        """
+        category = self.category(method, url)
+        idempotent = self.idempotent(method, url)
+        for attempt in range(self.max_retries + 1):
+            await self.acquire_async(category)
+            try:
+                return await send()
+            except Exception as error:
+                retry_after = self._retryable(error, attempt, idempotent)
+                if retry_after is None:
+                    raise
+                await asyncio.sleep(self._backoff_delay(category, attempt, retry_after))
+
+    def metrics(self):
+        """Instantané de l'ordonnanceur : profondeur de la file, jetons, compteurs."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "queue_depth": self._waiting,
+                "tokens": {name: round(bucket.available(now), 2) for name, bucket in self._buckets.items()},
+                **self._counters,
+            }
+
+
+def _retry_after(headers):
+    try:
+        return float(headers.get("Retry-After"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def _error_status(error):
+    """(statut HTTP, Retry-After) d'une erreur gspread ou aiohttp ; (None, None) sinon."""
+    if isinstance(error, APIError):
+        response = error.response
+        return getattr(response, "status_code", None), _retry_after(getattr(response, "headers", None))
+    return getattr(error, "status", None), _retry_after(getattr(error, "headers", None))
+
+
+def transient_error(error):
+    """L'erreur est-elle passagère (réseau, quota, serveur) et la requête à retenter plus tard ?"""
+    if isinstance(error, WorksheetNotFound):
+        return False
+    status, _ = _error_status(error)
+    return status is None or status == 429 or status >= 500
+
+
+# Ordonnanceur partagé par tout le processus
+quota_scheduler = QuotaScheduler()
+
+
+class QuotaHTTPClient(HTTPClient):
+    """Client HTTP gspread dont toutes les requêtes passent par `quota_scheduler`."""
+
+    scheduler = quota_scheduler
+
+    def request(self, method, endpoint, *args, **kwargs):
+        send = super().request
+        return self.scheduler.call(method, endpoint, lambda: send(method, endpoint, *args, **kwargs))
@@ -0,0 +1,75 @@
+from gspread.utils import absolute_range_name, rowcol_to_a1
+
+
+def a1_range(range_name):
+    """Convertit un nom de feuille en plage A1 (les plages A1 sont laissées telles quelles)."""
+    if "!" in range_name:
+        return range_name
+    return absolute_range_name(range_name)
+
+
+def column_letter(col):
+    """Lettre(s) d'une colonne 1-indexée (1 -> "A", 27 -> "AA")."""
+    return rowcol_to_a1(1, col).rstrip("0123456789")
+
+
+def column_blocks(header, columns):
+    """
+    Regroupe les colonnes demandées en blocs contigus.
+
+    Args:
+        header (list): En-tête de la feuille (noms nettoyés)
+        columns (list): Noms des colonnes à lire (les colonnes inconnues sont ignorées)
+
+    Returns:
+        tuple: Blocs (première colonne, dernière colonne), 1-indexés et triés
+    """
+    positions = sorted({header.index(column) + 1 for column in columns if column in header})
+    blocks = []
+    for position in positions:
+        if blocks and position == blocks[-1][1] + 1:
+            blocks[-1][1] = position
+        else:
+            blocks.append([position, position])
+    return tuple(tuple(block) for block in blocks)
+
+
+def block_ranges(worksheet_name, blocks, first_row=1, last_row=None):
+    """Plages A1 de chaque bloc de colonnes entre deux lignes (fin ouverte si last_row est None)."""
+    end_row = "" if last_row is None else last_row
+    return [
+        absolute_range_name(worksheet_name, f"{column_letter(start)}{first_row}:{column_letter(end)}{end_row}")
+        for start, end in blocks
+    ]
+
+
+def stitch_blocks(blocks, block_values):
+    """
+    Réassemble les valeurs lues bloc par bloc en lignes complètes.
+
+    L'API tronque les cellules et les lignes vides en fin de plage : chaque bloc est
+    complété à sa largeur pour que les colonnes restent alignées.
+    """
+    widths = [end - start + 1 for start, end in blocks]
+    height = max((len(values) for values in block_values), default=0)
+    rows = []
+    for idx in range(height):
+        row = []
+        for width, values in zip(widths, block_values):
+            cells = values[idx] if idx < len(values) else []
+            row.extend(cells)
+            row.extend([""] * (width - len(cells)))
+        rows.append(row)
+    return rows
+
+
+def projected_header(header, blocks):
+    """En-tête attendu d'une lecture projetée sur `blocks`."""
+    return [header[col - 1] if col <= len(header) else "" for start, end in blocks for col in range(start, end + 1)]
+
+
+def header_matches(values, header_idx, header, blocks):
+    """La ligne `header_idx` d'une lecture projetée sur `blocks` est-elle toujours l'en-tête attendu ?"""
+    expected = projected_header(header, blocks)
+    actual = values[header_idx] if header_idx < len(values) else []
+    return [str(cell).strip() for cell in actual] + [""] * (len(expected) - len(actual)) == expected
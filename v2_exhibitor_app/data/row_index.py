@@ -0,0 +1,154 @@
+import bisect
+import threading
+import uuid
+
+import pandas as pd
+
+# Colonnes qui identifient une commande dans "Orders" et les feuilles de section
+ORDER_KEY = ("Booth #", "Item", "Color")
+
+# Colonnes qui identifient un élément de "Booth Checklist"
+CHECKLIST_KEY = ("Booth #", "Item Name")
+
+# Identifiant unique d'une commande, attribué à l'ajout
+ORDER_ID_COLUMN = "Order ID"
+ORDER_ID_KEY = (ORDER_ID_COLUMN,)
+
+# Commandes antérieures à la colonne "Order ID" : (stand, article, couleur) et Order ID vide
+LEGACY_ORDER_KEY = ORDER_KEY + ORDER_ID_KEY
+
+
+def new_order_id():
+    """Nouvel identifiant de commande (12 caractères hexadécimaux)."""
+    return uuid.uuid4().hex[:12].upper()
+
+
+def normalize_cell(value):
+    """Normalise une valeur de cellule ou de filtre pour les comparaisons (chaîne sans espaces)."""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ""
+    return str(value).strip()
+
+
+def row_key(values):
+    """Clé normalisée d'une ligne (tuple de chaînes sans espaces superflus)."""
+    return tuple(normalize_cell(value) for value in values)
+
+
+def row_runs(row_numbers):
+    """
+    Regroupe des numéros de ligne en plages contiguës (début, fin incluse),
+    de la dernière à la première : supprimer dans cet ordre ne décale jamais
+    les plages restantes.
+    """
+    runs = []
+    for number in sorted(set(row_numbers)):
+        if runs and runs[-1][1] == number - 1:
+            runs[-1][1] = number
+        else:
+            runs.append([number, number])
+    return [tuple(run) for run in reversed(runs)]
+
+
+class RowIndex:
+    """
+    Index clé -> numéros de ligne (1-indexés) d'une feuille Google Sheets.
+
+    L'index est construit à partir d'une lecture des seules colonnes clés, puis
+    tenu à jour localement après les suppressions (décalage des lignes suivantes)
+    et les ajouts, pour adresser une ligne sans parcourir la feuille.
+
+    Args:
+        key_columns (tuple): Colonnes qui forment la clé
+        lock (threading.RLock): Verrou partagé avec les autres index de la même feuille
+    """
+
+    def __init__(self, key_columns, lock=None):
+        self.key_columns = tuple(key_columns)
+        self.lock = lock or threading.RLock()
+        self.built = False
+        self._rows = {}
+
+    def rebuild(self, frame):
+        """Reconstruit l'index depuis un DataFrame dont l'index contient les numéros de ligne."""
+        rows = {}
+        if not frame.empty and all(column in frame.columns for column in self.key_columns):
+            columns = [frame[column] for column in self.key_columns]
+            for row_number, *values in zip(frame.index, *columns):
+                rows.setdefault(row_key(values), []).append(int(row_number))
+        with self.lock:
+            self._rows = rows
+            self.built = True
+
+    def invalidate(self):
+        with self.lock:
+            self._rows = {}
+            self.built = False
+
+    def find(self, key):
+        """Numéros de ligne de la clé, triés (liste vide si inconnue)."""
+        with self.lock:
+            return list(self._rows.get(key, ()))
+
+    def add(self, key, row_number):
+        with self.lock:
+            bisect.insort(self._rows.setdefault(key, []), row_number)
+
+    def remove_rows(self, row_numbers):
+        """Retire des lignes supprimées et décale les numéros des lignes suivantes."""
+        deleted = sorted(set(row_numbers))
+        if not deleted:
+            return
+        deleted_set = set(deleted)
+        with self.lock:
+            rows = {}
+            for key, numbers in self._rows.items():
+                kept = [
+                    number - bisect.bisect_left(deleted, number)
+                    for number in numbers
+                    if number not in deleted_set
+                ]
+                if kept:
+                    rows[key] = kept
+            self._rows = rows
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+# Un verrou par feuille, commun à tous ses index : une ligne supprimée via un index
+# décale aussi les autres
+_worksheet_locks = {}
+
+
+def get_row_index(sheet_id, worksheet_name, key_columns):
+    """Retourne l'index partagé d'une feuille pour des colonnes clés (créé au besoin)."""
+    with _indexes_lock:
+        key = (sheet_id, worksheet_name, tuple(key_columns))
+        if key not in _indexes:
+            lock = _worksheet_locks.setdefault((sheet_id, worksheet_name), threading.RLock())
+            _indexes[key] = RowIndex(key_columns, lock)
+        return _indexes[key]
+
+
+def _worksheet_indexes(sheet_id, worksheet_name):
+    with _indexes_lock:
+        return [
+            index
+            for (index_sheet_id, index_name, _key_columns), index in _indexes.items()
+            if index_sheet_id == sheet_id and index_name == worksheet_name
+        ]
+
+
+def shift_row_indexes(sheet_id, worksheet_name, row_numbers):
+    """Reporte des suppressions de lignes dans tous les index d'une feuille."""
+    for index in _worksheet_indexes(sheet_id, worksheet_name):
+        index.remove_rows(row_numbers)
+
+
+def invalidate_row_indexes(sheet_id, worksheet_name=None):
+    """Oublie les index d'une feuille (ou de tout le classeur)."""
+    with _indexes_lock:
+        for (index_sheet_id, index_name, _key_columns), index in _indexes.items():
+            if index_sheet_id == sheet_id and worksheet_name in (None, index_name):
+                index.invalidate()
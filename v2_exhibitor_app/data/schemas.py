@@ -0,0 +1,139 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# Ligne de départ d'une plage A1 renvoyée par l'API ("'Orders'!A3:M500" -> 3)
+_RANGE_START_ROW = re.compile(r"!\$?[A-Za-z]*\$?(\d+)")
+
+
+class WorksheetSchema:
+    """
+    Schéma déclaré d'une feuille Google Sheets.
+
+    Args:
+        name (str): Nom de la feuille
+        key_columns (tuple): Colonnes qui identifient la ligne d'en-tête
+        numeric_columns (tuple): Colonnes converties en nombres
+        header_scan (int): Nombre de lignes examinées pour trouver l'en-tête
+    """
+
+    def __init__(self, name, key_columns, numeric_columns=(), header_scan=10):
+        self.name = name
+        self.key_columns = tuple(key_columns)
+        self.numeric_columns = frozenset(numeric_columns)
+        self.header_scan = header_scan
+
+    def find_header_row(self, values):
+        """Retourne l'index de la ligne d'en-tête dans `values` (0 si introuvable)."""
+        for idx, row in enumerate(values[:self.header_scan]):
+            cells = {str(cell).strip() for cell in row}
+            if all(column in cells for column in self.key_columns):
+                return idx
+        return 0
+
+
+ORDERS_SCHEMA = WorksheetSchema(
+    "Orders",
+    key_columns=("Booth #", "Item"),
+    numeric_columns=("Quantity", "Boomers Quantity"),
+)
+
+SCHEMAS = {
+    "Orders": ORDERS_SCHEMA,
+    "Shows": WorksheetSchema("Shows", key_columns=("Show Name",)),
+    "Show Inventory": WorksheetSchema("Show Inventory", key_columns=("Items",)),
+    "Booth Checklist": WorksheetSchema("Booth Checklist", key_columns=("Booth #", "Item Name")),
+}
+
+
+def schema_for(range_name):
+    """
+    Retourne le schéma d'une feuille ou d'une plage A1 ("Orders!A:M").
+
+    Les feuilles non déclarées sont les feuilles de section ("Main Floor", ...),
+    copies de "Orders" : elles sont lues avec son schéma, ligne de titre comprise.
+    """
+    sheet_name = range_name.split("!", 1)[0].strip("'")
+    return SCHEMAS.get(sheet_name, ORDERS_SCHEMA)
+
+
+def range_start_row(range_name):
+    """Numéro (1-indexé) de la première ligne d'une plage A1, 1 si non précisé."""
+    match = _RANGE_START_ROW.search(range_name or "")
+    return int(match.group(1)) if match else 1
+
+
+def _numeric_column(cells):
+    try:
+        # Chemin rapide : toutes les cellules non vides sont des nombres
+        values = pd.Series(cells.astype(float))
+    except (TypeError, ValueError):
+        values = pd.to_numeric(pd.Series(cells, dtype=object), errors="coerce")
+    present = values.dropna()
+    if (present % 1 == 0).all():
+        return values.astype("Int64")
+    return values
+
+
+def locate_header(values, schema=None):
+    """Retourne (index de la ligne d'en-tête, noms de colonnes nettoyés) pour `values`."""
+    if not values:
+        return 0, []
+    header_idx = schema.find_header_row(values) if schema else 0
+    return header_idx, [str(cell).strip() for cell in values[header_idx]]
+
+
+def parse_values(values, schema=None, first_row=1, header_idx=None):
+    """
+    Construit un DataFrame directement à partir de valeurs brutes (get_all_values / batchGet).
+
+    L'en-tête est la ligne désignée par le schéma ; les lignes vides sont ignorées,
+    les cellules vides deviennent NaN et les colonnes numériques du schéma sont typées.
+    L'index du DataFrame contient le numéro de ligne (1-indexé) dans la feuille.
+
+    Args:
+        values (list): Lignes de cellules telles que renvoyées par l'API
+        schema (WorksheetSchema): Schéma de la feuille, ou None (en-tête en première ligne)
+        first_row (int): Numéro de ligne dans la feuille de `values[0]`
+        header_idx (int): Index de la ligne d'en-tête s'il est déjà connu
+
+    Returns:
+        pd.DataFrame: Données de la feuille
+    """
+    if not values:
+        return pd.DataFrame()
+
+    if header_idx is None:
+        header_idx, header = locate_header(values, schema)
+    else:
+        header = [str(cell).strip() for cell in values[header_idx]] if header_idx < len(values) else []
+    width = len(header)
+
+    # Lignes non vides, complétées (ou tronquées) à la largeur de l'en-tête
+    rows, row_numbers = [], []
+    for offset, row in enumerate(values[header_idx + 1:], first_row + header_idx + 1):
+        if not any(row):
+            continue
+        if len(row) != width:
+            row = (row + [""] * (width - len(row)))[:width]
+        rows.append(row)
+        row_numbers.append(offset)
+
+    # Une seule grille d'objets : les cellules vides deviennent NaN en une opération
+    grid = np.empty((len(rows), width), dtype=object)
+    if rows:
+        grid[:] = rows
+    grid[grid == ""] = np.nan
+
+    numeric_columns = schema.numeric_columns if schema else frozenset()
+    index = pd.Index(row_numbers, name="row")
+    data = {}
+    for position, name in enumerate(header):
+        if not name or name in data:
+            continue
+        cells = grid[:, position]
+        column = _numeric_column(cells) if name in numeric_columns else pd.Series(cells, dtype=object, copy=False)
+        column.index = index
+        data[name] = column
+    return pd.DataFrame(data, index=index, copy=False)
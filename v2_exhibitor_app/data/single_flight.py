@@ -0,0 +1,67 @@
+import functools
+import threading
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Regroupe les appels identiques en cours : un seul s'exécute, les autres
+    attendent et reçoivent le même résultat (ou la même exception).
+
+    Le résultat est partagé tel quel entre les appelants : il ne doit pas être
+    modifié en place.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """Exécute `fn()` sauf si un appel de même clé est déjà en cours, auquel cas l'attend."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+        else:
+            call.done.wait()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+
+# Appels partagés par tout le processus
+_flights = SingleFlight()
+
+
+def coalesced(key):
+    """
+    Décorateur de méthode : les appels concurrents dont `key(*args, **kwargs)` est
+    identique partagent un seul appel (voir SingleFlight).
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            flight_key = (method.__qualname__, key(*args, **kwargs))
+            return _flights.do(flight_key, lambda: method(self, *args, **kwargs))
+        return wrapper
+    return decorator
@@ -0,0 +1,244 @@
+import threading
+import time
+from types import MappingProxyType
+
+from data.async_manager import async_sheets
+from data.delta_sync import invalidate_sync
+from data.orders_snapshot import OrdersSnapshot
+from data.quota import quota_scheduler
+from data.test_data_manager import split_version
+
+
+class WorkbookSnapshot:
+    """
+    Version publiée du classeur, partagée telle quelle par toutes les sessions.
+
+    Les feuilles sont exposées en lecture seule ; "Orders" est indexée par
+    stand (voir OrdersSnapshot). Une version publiée n'est jamais modifiée :
+    le service en publie une nouvelle, et les DataFrames ne doivent pas être
+    modifiés en place par les pages.
+
+    Args:
+        version (str): Version du classeur (None si elle n'a pas encore été sondée)
+        frames (dict): {feuille: DataFrame}
+    """
+
+    def __init__(self, version, frames):
+        frames = dict(frames)
+        if "Orders" in frames:
+            frames["Orders"] = OrdersSnapshot(frames["Orders"])
+        self.version = version
+        self._frames = MappingProxyType(frames)
+
+    def __getitem__(self, worksheet_name):
+        return self._frames[worksheet_name]
+
+    def __contains__(self, worksheet_name):
+        return worksheet_name in self._frames
+
+
+class SnapshotService:
+    """
+    Service unique par processus : un thread de fond sonde le classeur à
+    intervalle régulier et publie une nouvelle version quand il a changé.
+
+    Les sessions lisent `current` sans verrou ni appel réseau (la publication
+    est un simple remplacement de référence) : la charge sur l'API Sheets ne
+    dépend pas du nombre d'exposants connectés. Au démarrage, la dernière
+    version enregistrée sur disque est publiée immédiatement ; sans copie sur
+    disque, les feuilles sont lues en parallèle une première fois.
+
+    Le thread de fond n'appelle jamais Streamlit.
+
+    Args:
+        manager (GoogleSheetsManager): Gestionnaire utilisé pour les lectures
+        sheet_id (str): ID du classeur Google Sheets
+        columns (dict): Colonnes lues par feuille {feuille: [colonnes]}
+        incremental (list): Feuilles qui ne grandissent qu'en fin (lecture des nouvelles lignes seulement)
+        interval (float): Intervalle entre deux sondes, en secondes
+        fallback_interval (float): Période de rechargement complet quand la sonde échoue, en secondes
+        metrics_interval (float): Période du relevé de l'ordonnanceur de quota dans le journal, en secondes
+    """
+
+    def __init__(self, manager, sheet_id, columns, incremental=None, interval=10, fallback_interval=120,
+                 metrics_interval=300):
+        self.manager = manager
+        self.sheet_id = sheet_id
+        self.columns = columns
+        self.worksheet_names = list(columns)
+        self.incremental = list(incremental or [])
+        self.interval = interval
+        self.fallback_interval = fallback_interval
+        self.metrics_interval = metrics_interval
+        self._metrics_logged = time.monotonic()
+        self.current = None
+        self._published = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        # Écritures locales déjà rapprochées d'un changement de modifiedTime (voir _external_change)
+        self._attributed_writes = 0
+        # Sondes lancées et terminées par le thread de fond (attente de refresh)
+        self._polled = threading.Condition()
+        self._polls_started = 0
+        self._polls_done = 0
+
+    def start(self):
+        """Publie la version de départ puis démarre le thread de sondage (une seule fois)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return self
+            if self.current is None:
+                version, frames = self.manager.load_persisted(self.sheet_id, self.worksheet_names, columns=self.columns)
+                if frames is None:
+                    version, frames = self._read_concurrently()
+                if frames is not None:
+                    self._publish(version, frames)
+            self._thread = threading.Thread(target=self._run, name="sheets-snapshot", daemon=True)
+            self._thread.start()
+        return self
+
+    def get(self, timeout=60):
+        """
+        Version publiée courante.
+
+        N'attend que si rien n'a encore jamais été publié (premier démarrage,
+        sans copie sur disque et lecture parallèle en échec).
+
+        Returns:
+            WorkbookSnapshot: Version courante, ou None si aucune n'est disponible
+        """
+        snapshot = self.current
+        if snapshot is None:
+            self._published.wait(timeout)
+            snapshot = self.current
+        return snapshot
+
+    def refresh(self, wait=None):
+        """
+        Demande une sonde immédiate.
+
+        Args:
+            wait (float): Attente maximale, en secondes, de la fin d'une sonde lancée
+                après la demande (None : pas d'attente)
+
+        Returns:
+            bool: True si cette sonde s'est terminée dans le délai
+        """
+        with self._polled:
+            target = self._polls_started + 1
+        self._wake.set()
+        if wait is None:
+            return False
+        with self._polled:
+            return self._polled.wait_for(lambda: self._polls_done >= target, wait)
+
+    def poll(self):
+        """
+        Sonde le classeur et publie une nouvelle version s'il a changé.
+
+        Returns:
+            bool: True si une nouvelle version a été publiée
+        """
+        version = self.manager.get_version(self.sheet_id)
+        if version is None:
+            # Sonde indisponible : rechargement complet à période fixe
+            version = f"ttl-{int(time.time() // self.fallback_interval)}"
+
+        current = self.current
+        if current is not None and current.version == version:
+            return False
+        if current is not None and self._external_change(current.version, version):
+            # Modification faite ailleurs (statut, correction, suppression) : la synchronisation
+            # incrémentale ne la verrait pas, les colonnes projetées sont relues en entier
+            invalidate_sync(self.sheet_id)
+
+        # Une version déjà lue (par ce processus ou le précédent) est reprise du disque
+        _, frames = self.manager.load_persisted(self.sheet_id, self.worksheet_names, version, self.columns)
+        if frames is None:
+            try:
+                frames = self.manager.read_many(
+                    self.sheet_id,
+                    self.worksheet_names,
+                    incremental=self.incremental,
+                    columns=self.columns,
+                )
+            except Exception as e:
+                # Lecture en échec (erreur, quota) : rien n'est publié, la sonde suivante réessaie
+                print(f"Lecture du classeur impossible, version {version} non publiée: {e}")
+                return False
+            self.manager.persist_snapshot(self.sheet_id, version, frames, self.columns)
+
+        self._publish(version, frames)
+        return True
+
+    def _external_change(self, previous, version):
+        """
+        La nouvelle version contient-elle une modification faite hors de ce processus ?
+
+        Drive peut refléter nos propres écritures avec quelques secondes de retard :
+        un changement de modifiedTime est attribué à ce processus seulement s'il a
+        écrit depuis le dernier changement qui lui a été attribué. Sans sonde (version
+        de repli), le changement est toujours considéré comme externe.
+        """
+        previous_time, _ = split_version(previous)
+        modified_time, writes = split_version(version)
+        if previous_time is None or modified_time is None:
+            return True
+        if modified_time == previous_time:
+            return False
+        if writes > self._attributed_writes:
+            self._attributed_writes = writes
+            return False
+        return True
+
+    def _read_concurrently(self):
+        """
+        Première lecture sans copie sur disque : une requête par feuille, en parallèle.
+
+        La version est sondée avant la lecture, qui est enregistrée sous cette version :
+        la première sonde du thread de fond ne relit pas un classeur inchangé.
+
+        Returns:
+            tuple: (version, {feuille: DataFrame}), ou (None, None) si la lecture échoue
+        """
+        version = self.manager.get_version(self.sheet_id)
+        try:
+            frames = async_sheets.run(
+                async_sheets.read_many(self.sheet_id, self.worksheet_names, columns=self.columns),
+                timeout=60,
+            )
+        except Exception as e:
+            print(f"Lecture parallèle du classeur impossible: {e}")
+            return None, None
+        if version is not None:
+            self.manager.persist_snapshot(self.sheet_id, version, frames, self.columns)
+        return version, frames
+
+    def _publish(self, version, frames):
+        # Remplacement atomique de la référence : les lecteurs voient l'ancienne ou la nouvelle version
+        self.current = WorkbookSnapshot(version, frames)
+        self._published.set()
+
+    def _log_quota(self):
+        """Relevé périodique de l'ordonnanceur de quota (attentes, 429, abandons) dans le journal."""
+        now = time.monotonic()
+        if now - self._metrics_logged < self.metrics_interval:
+            return
+        self._metrics_logged = now
+        print(f"Quota Sheets: {quota_scheduler.metrics()}")
+
+    def _run(self):
+        while True:
+            with self._polled:
+                self._polls_started += 1
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"Erreur du thread de sondage du classeur: {e}")
+            with self._polled:
+                self._polls_done += 1
+                self._polled.notify_all()
+            self._log_quota()
+            self._wake.wait(self.interval)
+            self._wake.clear()
@@ -1,56 +1,258 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import ExitStack
+from functools import partial
+
 import pandas as pd
-import gspread
-from google.oauth2.service_account import Credentials
+from gspread.exceptions import APIError, WorksheetNotFound
+from gspread.utils import absolute_range_name, rowcol_to_a1
 import streamlit as st
-from gspread_dataframe import get_as_dataframe, set_with_dataframe
+from gspread_dataframe import set_with_dataframe
 from datetime import datetime
 
+from data.client_pool import SCOPES, client_pool
+from data.delta_sync import get_sync, invalidate_sync
+from data.disk_cache import snapshot_store
+from data.fanout import failures, fan_out
+from data.query import indexed_backend
+from data.ranges import a1_range, block_ranges, column_blocks, column_letter, header_matches, projected_header, stitch_blocks
+from data.row_index import (
+    CHECKLIST_KEY, LEGACY_ORDER_KEY, ORDER_ID_COLUMN, ORDER_ID_KEY, ORDER_KEY, get_row_index, invalidate_row_indexes,
+    new_order_id, row_key, row_runs, shift_row_indexes,
+)
+from data.schemas import locate_header, parse_values, range_start_row, schema_for
+from data.single_flight import coalesced
+
+
+class _HandleCache:
+    """
+    Cache LRU borné des objets Spreadsheet et Worksheet de gspread.
+
+    Les clés sont (sheet_id, None) pour un classeur et (sheet_id, titre) pour
+    une feuille. Le cache est partagé par tout le processus : il évite les
+    appels de métadonnées (open_by_key, worksheet) avant chaque opération.
+    """
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            handle = self._items.get(key)
+            if handle is not None:
+                self._items.move_to_end(key)
+            return handle
+
+    def put(self, key, handle):
+        with self._lock:
+            self._items[key] = handle
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def invalidate(self, sheet_id):
+        """Oublie le classeur et toutes ses feuilles (changement de structure)."""
+        with self._lock:
+            for key in [key for key in self._items if key[0] == sheet_id]:
+                del self._items[key]
+
+
+_handles = _HandleCache()
+
+
+# URL de l'API Drive utilisée comme sonde de fraîcheur (date de dernière modification)
+DRIVE_FILE_URL = "https://www.googleapis.com/drive/v3/files/{}"
+
+# Écritures faites par ce processus, par classeur : Drive peut mettre quelques secondes
+# à refléter une modification, nos propres écritures doivent se voir immédiatement
+_local_writes = {}
+_local_writes_lock = threading.Lock()
+
+
+# Champs modifiables d'un élément de checklist
+CHECKLIST_FIELDS = ('Status', 'Date', 'Hour')
+
+# En-têtes connus par feuille : (sheet_id, titre) -> (index de la ligne d'en-tête, noms)
+_headers = {}
+
+# Une seule migration "Order ID" à la fois dans le processus (voir migrate_order_ids)
+_order_id_lock = threading.Lock()
+
+
+def workbook_version(sheet_id, modified_time):
+    """Version du classeur : modifiedTime Drive et nombre d'écritures locales."""
+    with _local_writes_lock:
+        return f"{modified_time}#{_local_writes.get(sheet_id, 0)}"
+
+
+def split_version(version):
+    """(modifiedTime Drive, écritures locales) d'une version du classeur ; (None, None) si elle n'en vient pas."""
+    modified_time, separator, writes = (version or "").rpartition("#")
+    if not separator or not writes.isdigit():
+        return None, None
+    return modified_time, int(writes)
+
+
+def record_write(sheet_id):
+    """Signale une écriture faite par ce processus (change la version du classeur)."""
+    with _local_writes_lock:
+        _local_writes[sheet_id] = _local_writes.get(sheet_id, 0) + 1
+    indexed_backend.expire_probe(sheet_id)
+
+
+def _write_generation(sheet_id):
+    with _local_writes_lock:
+        return _local_writes.get(sheet_id, 0)
+
+
+# Les clés de regroupement incluent le nombre d'écritures locales : une lecture
+# demandée après une écriture ne rejoint jamais une lecture lancée avant elle
+
+def _data_key(sheet_id, worksheet_name, columns=None):
+    """Clé de regroupement d'une lecture get_data : (classeur, feuille ou plage, colonnes)."""
+    return sheet_id, worksheet_name, tuple(columns or ()), _write_generation(sheet_id)
+
+
+def _many_key(sheet_id, ranges, incremental=(), columns=None):
+    """Clé de regroupement d'une lecture get_many."""
+    frozen_columns = tuple(sorted((name, tuple(names)) for name, names in (columns or {}).items()))
+    return sheet_id, tuple(ranges), tuple(incremental), frozen_columns, _write_generation(sheet_id)
+
+
+def _projection_keys(worksheet_names, columns=None):
+    """
+    Empreinte, par feuille, des colonnes lues et du schéma : un instantané disque
+    n'est réutilisé que par une lecture identique (même après un redéploiement).
+    """
+    columns = columns or {}
+    keys = {}
+    for name in worksheet_names:
+        schema = schema_for(name)
+        description = repr((
+            list(columns.get(name) or ()),
+            schema.name, schema.key_columns, sorted(schema.numeric_columns), schema.header_scan,
+        ))
+        keys[name] = hashlib.sha1(description.encode("utf-8")).hexdigest()[:16]
+    return keys
+
+
 class GoogleSheetsManager:
     """Gestionnaire pour interagir avec les fichiers Google Sheets."""
     
-    def __init__(self):
+    def __init__(self, query_backend=None):
+        # Moteur de requête utilisé par query() (évaluation en mémoire par défaut)
+        self.query_backend = query_backend or indexed_backend
+
         # Définir les scopes nécessaires pour l'API
-        self.scopes = [
-            'https://www.googleapis.com/auth/spreadsheets',
-            'https://www.googleapis.com/auth/drive'
-        ]
-        
-        # Se connecter à l'API Google Sheets
-        # self._connect()
-        self.client = self._connect()
+        self.scopes = SCOPES
         
-    @st.cache_resource(ttl=3600)
-    def _connect(_self):
-        # """Établit la connexion à l'API Google Sheets."""
-        # try:
-        #     # Récupérer les identifiants depuis les secrets Streamlit
-        #     credentials = Credentials.from_service_account_info(
-        #         st.secrets["gcp_service_account"],
-        #         scopes=_self.scopes
-        #     )
-            
-        #     # Créer le client gspread
-        #     _self.client = gspread.authorize(credentials)
-        #     return _self.client
-        # except Exception as e:
-        #     st.error(f"Erreur de connexion à Google Sheets: {e}")
-        #     return None
+    @property
+    def client(self):
+        """Client gspread partagé (jeton rafraîchi avant expiration par le pool)."""
+        return self._connect()
+
+    def _connect(self):
+        """Établit la connexion à l'API Google Sheets via le pool de clients partagé."""
         try:
-            credentials = Credentials.from_service_account_info(
-                st.secrets["gcp_service_account"],
-                scopes=_self.scopes
-            )
-            return gspread.authorize(credentials)
+            return client_pool.get()
         except Exception as e:
             st.error(f"Erreur de connexion à Google Sheets: {e}")
             return None
     
+    def open_spreadsheet(self, sheet_id):
+        """Retourne le classeur depuis le cache de handles (open_by_key au premier accès)."""
+        spreadsheet = _handles.get((sheet_id, None))
+        if spreadsheet is None:
+            spreadsheet = self.client.open_by_key(sheet_id)
+            _handles.put((sheet_id, None), spreadsheet)
+        return spreadsheet
+
+    def _cache_worksheets(self, sheet_id, spreadsheet):
+        """Recharge la structure du classeur et met en cache toutes ses feuilles."""
+        worksheets = spreadsheet.worksheets()
+        _handles.invalidate(sheet_id)
+        _handles.put((sheet_id, None), spreadsheet)
+        for worksheet in worksheets:
+            _handles.put((sheet_id, worksheet.title), worksheet)
+        return worksheets
+
+    def open_worksheet(self, sheet_id, worksheet_name):
+        """Retourne une feuille depuis le cache de handles, sans appel de métadonnées."""
+        worksheet = _handles.get((sheet_id, worksheet_name))
+        if worksheet is not None:
+            return worksheet
+
+        # Un seul appel de métadonnées remplit le cache pour toutes les feuilles du classeur
+        for worksheet in self._cache_worksheets(sheet_id, self.open_spreadsheet(sheet_id)):
+            if worksheet.title == worksheet_name:
+                return worksheet
+        raise WorksheetNotFound(worksheet_name)
+
+    def _forget_handles(self, sheet_id, error):
+        """Invalide le cache de handles si l'erreur indique un changement de structure."""
+        if isinstance(error, WorksheetNotFound):
+            _handles.invalidate(sheet_id)
+        elif isinstance(error, APIError) and getattr(error.response, "status_code", None) in (400, 404):
+            # Plage introuvable : feuille renommée ou supprimée depuis la mise en cache
+            _handles.invalidate(sheet_id)
+
+    def get_version(self, sheet_id):
+        """
+        Sonde de fraîcheur peu coûteuse : version courante du classeur, sans lire les données.
+
+        La version combine le modifiedTime du fichier dans Drive et le nombre d'écritures
+        faites par ce processus. Elle ne change que si le classeur a été modifié.
+
+        Returns:
+            str: Version du classeur, ou None si la sonde a échoué
+        """
+        try:
+            response = self.client.http_client.request(
+                "get",
+                DRIVE_FILE_URL.format(sheet_id),
+                params={"fields": "modifiedTime", "supportsAllDrives": True},
+            )
+            modified_time = response.json()["modifiedTime"]
+        except Exception as e:
+            print(f"Sonde de fraîcheur indisponible: {e}")
+            return None
+        return workbook_version(sheet_id, modified_time)
+
+    def persist_snapshot(self, sheet_id, version, frames, columns=None):
+        """
+        Enregistre sur disque les DataFrames d'une version du classeur (redémarrage à chaud).
+
+        `columns` est la projection avec laquelle les feuilles ont été lues (voir get_many).
+        """
+        try:
+            snapshot_store.save(sheet_id, version, frames, _projection_keys(frames, columns))
+        except Exception as e:
+            print(f"Erreur lors de l'enregistrement de l'instantané: {e}")
+
+    def load_persisted(self, sheet_id, worksheet_names, version=None, columns=None):
+        """
+        Charge depuis le disque un instantané enregistré par persist_snapshot avec
+        la même projection `columns`.
+
+        Returns:
+            tuple: (version, {feuille: DataFrame}), ou (None, None) si absent
+        """
+        try:
+            return snapshot_store.load(sheet_id, worksheet_names, version, _projection_keys(worksheet_names, columns))
+        except Exception as e:
+            print(f"Erreur lors de la lecture de l'instantané: {e}")
+            return None, None
+
     def get_worksheets(self, sheet_id):
         """Récupère la liste des feuilles d'un classeur Google Sheets."""
         try:
-            spreadsheet = self.client.open_by_key(sheet_id)
-            return [worksheet.title for worksheet in spreadsheet.worksheets()]
+            spreadsheet = self.open_spreadsheet(sheet_id)
+            return [worksheet.title for worksheet in self._cache_worksheets(sheet_id, spreadsheet)]
         except Exception as e:
+            self._forget_handles(sheet_id, e)
             st.error(f"Erreur lors de la récupération des feuilles: {e}")
             return []
             
@@ -73,7 +275,8 @@ class GoogleSheetsManager:
     #         st.error(f"Erreur lors de la récupération des données: {e}")
     #         return pd.DataFrame()
 
-    def get_data(self, sheet_id, worksheet_name):
+    @coalesced(_data_key)
+    def get_data(self, sheet_id, worksheet_name, columns=None):
         # """Récupère les données d'une feuille Google Sheets."""
         # try:
         #     # Utiliser la même approche de connexion que dans add_order
@@ -100,93 +303,499 @@ class GoogleSheetsManager:
         # except Exception as e:
         #     # st.error(f"Erreur lors de la récupération des données: {e}")
         #     return pd.DataFrame()
-        """Récupère les données d'une feuille Google Sheets."""
+        """
+        Récupère les données d'une feuille Google Sheets.
+
+        Args:
+            sheet_id (str): ID du classeur Google Sheets
+            worksheet_name (str): Nom de la feuille ou plage A1 ("Orders!A:I")
+            columns (list): Colonnes à lire ; seules ces colonnes sont téléchargées
+
+        Returns:
+            pd.DataFrame: Données de la feuille (vide en cas d'erreur)
+        """
+        if columns or "!" in worksheet_name:
+            projection = {worksheet_name: columns} if columns else None
+            return self.get_many(sheet_id, [worksheet_name], columns=projection)[worksheet_name]
         try:
-            sheet = self.client.open_by_key(sheet_id)
-            worksheet = sheet.worksheet(worksheet_name)
-            df = get_as_dataframe(worksheet, evaluate_formulas=True, skipinitialspace=True)
-            df = df.dropna(how='all').reset_index(drop=True)
-            return df
+            worksheet = self.open_worksheet(sheet_id, worksheet_name)
+            values = worksheet.get_all_values()
+            schema = schema_for(worksheet_name)
+            _headers[(sheet_id, worksheet_name)] = locate_header(values, schema)
+            return parse_values(values, schema)
         except Exception as e:
+            self._forget_handles(sheet_id, e)
             # st.error(f"Erreur lors de la récupération des données: {e}")
             return pd.DataFrame()
     
-    def update_order_status(self, sheet_id, worksheet, booth_num, item_name, color, status, user):
-        """Met à jour le statut d'une commande dans le classeur Order Tracking."""
+    def _load_headers(self, sheet_id, worksheet_names):
+        """Retourne {feuille: (index, en-tête)} ; les en-têtes inconnus sont lus en un seul batchGet."""
+        missing = [name for name in worksheet_names if (sheet_id, name) not in _headers]
+        if missing:
+            spreadsheet = self.open_spreadsheet(sheet_id)
+            scan_ranges = [
+                absolute_range_name(name, f"1:{schema_for(name).header_scan}")
+                for name in missing
+            ]
+            value_ranges = spreadsheet.values_batch_get(scan_ranges).get("valueRanges", [])
+            for name, value_range in zip(missing, value_ranges):
+                _headers[(sheet_id, name)] = locate_header(value_range.get("values", []), schema_for(name))
+        return {name: _headers[(sheet_id, name)] for name in worksheet_names}
+
+    def _batch_get_values(self, sheet_id, ranges, syncs, blocks):
+        """
+        Exécute le batchGet de `ranges` et retourne {nom: (valeurs, première ligne)}.
+
+        Les feuilles présentes dans `blocks` ne demandent que leurs blocs de colonnes.
+        Celles présentes dans `syncs` ne demandent que leur sonde et leur queue ;
+        celles dont la sonde échoue sont relues en entier dans un second appel.
+        """
+        spreadsheet = self.open_spreadsheet(sheet_id)
+        requested, slices = [], {}
+        for name in ranges:
+            if name in syncs:
+                names = syncs[name].ranges()
+            elif name in blocks:
+                names = block_ranges(name, blocks[name])
+            else:
+                names = [a1_range(name)]
+            slices[name] = (len(requested), len(names))
+            requested.extend(names)
+        value_ranges = spreadsheet.values_batch_get(requested).get("valueRanges", [])
+
+        results, resync = {}, []
+        for name in ranges:
+            start, count = slices[name]
+            chunk = value_ranges[start:start + count]
+            if name in syncs:
+                values = syncs[name].apply(chunk)
+                if values is None:
+                    resync.append(name)
+                else:
+                    results[name] = (values, 1)
+            elif name in blocks:
+                results[name] = (stitch_blocks(blocks[name], [value_range.get("values", []) for value_range in chunk]), 1)
+            else:
+                value_range = chunk[0] if chunk else {}
+                results[name] = (value_range.get("values", []), range_start_row(value_range.get("range")))
+
+        if resync:
+            # Suppression ou modification détectée : relecture complète de ces feuilles
+            full_ranges = [syncs[name].full_ranges() for name in resync]
+            value_ranges = spreadsheet.values_batch_get(sum(full_ranges, [])).get("valueRanges", [])
+            start = 0
+            for name, names in zip(resync, full_ranges):
+                results[name] = (syncs[name].apply(value_ranges[start:start + len(names)]), 1)
+                start += len(names)
+        return results
+
+    def get_many(self, sheet_id, ranges, incremental=(), columns=None):
+        """
+        Récupère plusieurs feuilles ou plages A1 en un seul appel values:batchGet.
+
+        Mêmes arguments que read_many ; en cas d'erreur, chaque feuille est un
+        DataFrame vide.
+        """
         try:
-            # Ouvrir le classeur et accéder à la feuille
-            spreadsheet = self.client.open_by_key(sheet_id)
-            worksheet = spreadsheet.worksheet(worksheet)
-            
-            # Obtenir toutes les valeurs
-            data = worksheet.get_all_records()
+            return self.read_many(sheet_id, ranges, incremental, columns)
+        except Exception:
+            return {name: pd.DataFrame() for name in ranges}
+
+    @coalesced(_many_key)
+    def read_many(self, sheet_id, ranges, incremental=(), columns=None):
+        """
+        Récupère plusieurs feuilles ou plages A1 en un seul appel values:batchGet.
+
+        Contrairement à get_many, les erreurs sont levées : une feuille vide est
+        toujours une vraie feuille vide.
+
+        Args:
+            sheet_id (str): ID du classeur Google Sheets
+            ranges (list): Noms de feuilles ("Orders") ou plages A1 ("Orders!A1:M")
+            incremental (list): Feuilles de `ranges` alimentées par ajout seul ; seule la
+                queue ajoutée depuis la dernière lecture est téléchargée
+            columns (dict): Colonnes à lire par feuille ({"Shows": ["Show Name"]}) ;
+                seules ces colonnes sont téléchargées
+
+        Returns:
+            dict: DataFrame par élément de `ranges`, typé selon le schéma de la feuille
+        """
+        columns = columns or {}
+        try:
+            headers = self._load_headers(sheet_id, [name for name in ranges if name in columns])
+            blocks = {}
+            for name, (header_idx, header) in headers.items():
+                name_blocks = column_blocks(header, columns[name])
+                if name_blocks:
+                    blocks[name] = name_blocks
+            syncs = {name: get_sync(sheet_id, name, blocks.get(name)) for name in ranges if name in incremental}
+
+            with ExitStack() as stack:
+                for name in sorted(syncs):
+                    stack.enter_context(syncs[name].lock)
+                results = self._batch_get_values(sheet_id, ranges, syncs, blocks)
+
+            frames = {}
+            for name, (values, first_row) in results.items():
+                schema = schema_for(name)
+                if name not in blocks:
+                    if "!" not in name:
+                        _headers[(sheet_id, name)] = locate_header(values, schema)
+                    frames[name] = parse_values(values, schema, first_row=first_row)
+                    continue
+
+                header_idx, header = headers[name]
+                if not header_matches(values, header_idx, header, blocks[name]):
+                    # Colonnes déplacées depuis la lecture de l'en-tête : il sera relu au prochain appel
+                    _headers.pop((sheet_id, name), None)
+                    header_idx = None
+                frames[name] = parse_values(values, schema, first_row=first_row, header_idx=header_idx)
+            return frames
+        except Exception as e:
+            self._forget_handles(sheet_id, e)
+            raise
+
+    def query(self, sheet_id, worksheet, where=None, columns=None):
+        """
+        Retourne les lignes d'une feuille qui correspondent à un filtre d'égalité.
+
+        Le filtre est confié au moteur de requête du gestionnaire (poussé vers Google
+        Sheets ou évalué sur l'index en mémoire). Si un moteur distant échoue, la
+        requête est évaluée en mémoire.
+
+        Args:
+            sheet_id (str): ID du classeur Google Sheets
+            worksheet (str): Nom de la feuille
+            where (dict): Filtre {colonne: valeur}, ex. {"Booth #": "108"}
+            columns (list): Colonnes à retourner (toutes par défaut)
+
+        Returns:
+            pd.DataFrame: Lignes correspondantes (vide en cas d'erreur)
+        """
+        where = where or {}
+        try:
+            return self.query_backend.run(self, sheet_id, worksheet, where, columns)
+        except Exception as e:
+            print(f"Erreur du moteur de requête, évaluation en mémoire: {e}")
+        if self.query_backend is indexed_backend:
+            return pd.DataFrame()
+        try:
+            return indexed_backend.run(self, sheet_id, worksheet, where, columns)
+        except Exception as e:
+            self._forget_handles(sheet_id, e)
+            return pd.DataFrame()
+
+    def _column_map(self, sheet_id, worksheet_name):
+        """Retourne {nom de colonne: numéro de colonne (1-indexé)} depuis l'en-tête en cache."""
+        _, header = self._load_headers(sheet_id, [worksheet_name])[worksheet_name]
+        columns = {}
+        for idx, name in enumerate(header, 1):
+            if name and name not in columns:
+                columns[name] = idx
+        return columns
+
+    def _read_keys(self, sheet_id, worksheet_name, key_columns, row_numbers):
+        """Relit les colonnes clés de quelques lignes en un seul batchGet : {ligne: clé}."""
+        _, header = self._load_headers(sheet_id, [worksheet_name])[worksheet_name]
+        blocks = column_blocks(header, key_columns)
+        names = projected_header(header, blocks)
+        row_numbers = sorted(set(row_numbers))
+        ranges = [
+            range_name
+            for row_number in row_numbers
+            for range_name in block_ranges(worksheet_name, blocks, row_number, row_number)
+        ]
+        value_ranges = self.open_spreadsheet(sheet_id).values_batch_get(ranges).get("valueRanges", [])
+        keys = {}
+        for idx, row_number in enumerate(row_numbers):
+            chunk = value_ranges[idx * len(blocks):(idx + 1) * len(blocks)]
+            cells = stitch_blocks(blocks, [value_range.get("values", []) for value_range in chunk])
+            values = dict(zip(names, cells[0])) if cells else {}
+            keys[row_number] = row_key(values.get(column, "") for column in key_columns)
+        return keys
+
+    def _read_fresh(self, sheet_id, worksheet_name, columns):
+        """
+        Lit des colonnes sans passer par le regroupement des lectures : les index de
+        lignes ne doivent jamais être construits à partir d'une lecture lancée avant
+        une écriture.
+        """
+        projection = {worksheet_name: list(columns)}
+        return GoogleSheetsManager.read_many.__wrapped__(self, sheet_id, [worksheet_name], columns=projection)[worksheet_name]
+
+    def _locate_rows(self, sheet_id, worksheet_name, key_columns, keys):
+        """
+        Retourne {clé: numéro de ligne ou None} pour des clés normalisées (voir row_key).
+
+        Les lignes trouvées dans l'index en cache sont vérifiées par une lecture ciblée
+        des colonnes clés ; si l'index est absent ou périmé, il est reconstruit à partir
+        d'une lecture des seules colonnes clés.
+        """
+        found = self._locate_all_rows(sheet_id, worksheet_name, key_columns, {key: 1 for key in keys})
+        return {key: rows[0] if rows else None for key, rows in found.items()}
+
+    def _locate_all_rows(self, sheet_id, worksheet_name, key_columns, counts):
+        """
+        Retourne {clé: numéros de ligne} pour au plus `counts[clé]` lignes par clé.
+
+        Même stratégie que _locate_rows : index vérifié par un seul batchGet, ou
+        reconstruit depuis les colonnes clés s'il est absent, incomplet ou périmé.
+        Lève KeyError si l'en-tête de la feuille n'a pas toutes les colonnes clés.
+        """
+        header = self._column_map(sheet_id, worksheet_name)
+        missing = [column for column in key_columns if column not in header]
+        if missing:
+            raise KeyError(f"Colonnes introuvables dans '{worksheet_name}': {', '.join(missing)}")
+
+        index = get_row_index(sheet_id, worksheet_name, key_columns)
+        with index.lock:
+            if index.built:
+                found = {key: index.find(key)[:count] for key, count in counts.items()}
+                if all(len(found[key]) == count for key, count in counts.items()):
+                    candidates = {row: key for key, rows in found.items() for row in rows}
+                    actual = self._read_keys(sheet_id, worksheet_name, key_columns, candidates)
+                    if all(actual.get(row) == key for row, key in candidates.items()):
+                        return found
+
+            # Index absent ou périmé : une lecture des colonnes clés suffit à le reconstruire
+            index.rebuild(self._read_fresh(sheet_id, worksheet_name, key_columns))
+            return {key: index.find(key)[:count] for key, count in counts.items()}
+
+    def _field_updates(self, sheet_id, worksheet_name, row_number, fields):
+        """Plages A1 et valeurs d'une mise à jour de champs {colonne: valeur} sur une ligne."""
+        columns = self._column_map(sheet_id, worksheet_name)
+        return [
+            {"range": rowcol_to_a1(row_number, columns[name]), "values": [[value]]}
+            for name, value in fields.items()
+            if name in columns
+        ]
+
+    def _order_keys(self, sheet_id, worksheet_name, booth_num, item_name, color, order_id=None):
+        """
+        Clés candidates d'une commande, dans l'ordre de recherche : son Order ID puis,
+        pour une commande antérieure à la colonne "Order ID" (identifiant vide),
+        (stand, article, couleur). Sans Order ID, seule la clé (stand, article, couleur).
+        """
+        composite = row_key([booth_num, item_name, color])
+        if not order_id or ORDER_ID_COLUMN not in self._column_map(sheet_id, worksheet_name):
+            return [(ORDER_KEY, composite)]
+        keys = [(ORDER_ID_KEY, row_key([order_id]))]
+        if booth_num and item_name:
+            keys.append((LEGACY_ORDER_KEY, composite + ("",)))
+        return keys
+
+    def _locate_order(self, sheet_id, worksheet_name, booth_num, item_name, color, order_id=None):
+        """Numéro de ligne d'une commande, ou None si elle est introuvable (voir _order_keys)."""
+        for key_columns, key in self._order_keys(sheet_id, worksheet_name, booth_num, item_name, color, order_id):
+            row_number = self._locate_rows(sheet_id, worksheet_name, key_columns, [key])[key]
+            if row_number is not None:
+                return row_number
+        return None
+
+    def order_id_column(self, sheet_id, worksheet_name):
+        """
+        Numéro (1-indexé) de la colonne "Order ID" d'une feuille de commandes.
+
+        Aucune écriture : la colonne est créée par migrate_order_ids.
+
+        Returns:
+            int: Numéro de la colonne, ou None si la feuille ne l'a pas
+        """
+        return self._column_map(sheet_id, worksheet_name).get(ORDER_ID_COLUMN)
+
+    def migrate_order_ids(self, sheet_id, worksheet_names=None):
+        """
+        Migration explicite (démarrage ou administration) : ajoute la colonne
+        "Order ID" aux feuilles de commandes qui ne l'ont pas.
+
+        Seules les feuilles dont l'en-tête localisé contient les colonnes clés d'une
+        commande sont migrées. La colonne est placée après la dernière colonne nommée,
+        et seulement si elle est vide : une donnée sous un en-tête vide n'est jamais
+        écrasée. Dans "Orders", un identifiant est attribué à chaque commande existante
+        (en-tête et identifiants écrits en une seule requête) ; dans une feuille de
+        section, les commandes existantes gardent un identifiant vide et restent
+        adressées par (stand, article, couleur). Sans effet si la colonne existe déjà.
+
+        Args:
+            sheet_id (str): ID du classeur Google Sheets
+            worksheet_names (list): Feuilles à migrer (par défaut toutes celles du classeur)
+
+        Returns:
+            dict: {feuille de commandes: numéro de la colonne "Order ID", ou None si non créée}
+        """
+        columns = {}
+        with _order_id_lock:
+            try:
+                names = worksheet_names or self.get_worksheets(sheet_id)
+                headers = self._load_headers(sheet_id, names)
+                for worksheet_name in names:
+                    header_idx, header = headers[worksheet_name]
+                    if not all(name in header for name in ORDER_KEY):
+                        continue
+                    if ORDER_ID_COLUMN in header:
+                        columns[worksheet_name] = header.index(ORDER_ID_COLUMN) + 1
+                        continue
+                    columns[worksheet_name] = self._create_order_id_column(sheet_id, worksheet_name, header_idx, header)
+            except Exception as e:
+                self._forget_handles(sheet_id, e)
+                print(f"Migration de la colonne \"{ORDER_ID_COLUMN}\" interrompue: {e}")
+        return columns
+
+    def _create_order_id_column(self, sheet_id, worksheet_name, header_idx, header):
+        """Crée la colonne "Order ID" d'une feuille (voir migrate_order_ids) ; None si sa place est occupée."""
+        column = max((idx for idx, name in enumerate(header, 1) if name), default=0) + 1
+        header_row = header_idx + 1
+        letter = column_letter(column)
+        worksheet = self.open_worksheet(sheet_id, worksheet_name)
+        if column <= worksheet.col_count:
+            target = absolute_range_name(worksheet_name, f"{letter}{header_row}:{letter}")
+            value_range = self.open_spreadsheet(sheet_id).values_batch_get([target]).get("valueRanges", [{}])[0]
+            if any(cell for row in value_range.get("values", []) for cell in row):
+                print(f"Colonne {letter} de '{worksheet_name}' non vide: colonne \"{ORDER_ID_COLUMN}\" non créée")
+                return None
+        else:
+            worksheet.add_cols(column - worksheet.col_count)
+
+        if worksheet_name == "Orders":
+            # Identifiants des commandes existantes (lignes dont la clé n'est pas vide)
+            existing = self._read_fresh(sheet_id, worksheet_name, ORDER_KEY)
+            data_rows = {int(row) for row in existing.index}
+            last_row = max(data_rows, default=header_row)
+            values = [[ORDER_ID_COLUMN]] + [
+                [new_order_id() if row in data_rows else ""]
+                for row in range(header_row + 1, last_row + 1)
+            ]
+        else:
+            last_row, values = header_row, [[ORDER_ID_COLUMN]]
+        worksheet.batch_update([{"range": f"{letter}{header_row}:{letter}{last_row}", "values": values}])
+
+        _headers.pop((sheet_id, worksheet_name), None)
+        invalidate_sync(sheet_id, worksheet_name)
+        invalidate_row_indexes(sheet_id, worksheet_name)
+        record_write(sheet_id)
+        return column
+
+    def append_order_rows(self, sheet_id, worksheet_name, rows, skip_existing=False):
+        """
+        Ajoute des lignes de commande en un seul append_rows.
+
+        La dernière valeur de chaque ligne est son Order ID, placée dans la colonne
+        "Order ID" de la feuille (ou omise si la feuille n'a pas cette colonne, voir
+        migrate_order_ids). Les nouvelles lignes sont ajoutées aux index déjà construits sans
+        relecture. Avec `skip_existing`, les lignes dont l'Order ID est déjà dans la
+        feuille ne sont pas rajoutées (nouvel essai après une erreur ambiguë).
+        """
+        column = self.order_id_column(sheet_id, worksheet_name)
+        if skip_existing and column is not None:
+            keys = [row_key(row[-1:]) for row in rows]
+            found = self._locate_rows(sheet_id, worksheet_name, ORDER_ID_KEY, keys)
+            rows = [row for row, key in zip(rows, keys) if found[key] is None]
+            if not rows:
+                return
+        if column is None:
+            rows = [row[:-1] for row in rows]
+        else:
+            rows = [
+                row[:-1] + [""] * (column - len(row)) + row[-1:] if column > len(row) else row
+                for row in rows
+            ]
+        response = self.open_worksheet(sheet_id, worksheet_name).append_rows(rows)
+        record_write(sheet_id)
+
+        updated_range = (response or {}).get("updates", {}).get("updatedRange")
+        if not updated_range:
+            return
+        first_row = range_start_row(updated_range)
+        columns = self._column_map(sheet_id, worksheet_name)
+        for key_columns in (ORDER_ID_KEY, ORDER_KEY, LEGACY_ORDER_KEY):
+            if not all(name in columns for name in key_columns):
+                continue
+            index = get_row_index(sheet_id, worksheet_name, key_columns)
+            with index.lock:
+                if not index.built:
+                    continue
+                for offset, row in enumerate(rows):
+                    cells = [row[columns[name] - 1] if columns[name] <= len(row) else "" for name in key_columns]
+                    index.add(row_key(cells), first_row + offset)
+
+    def update_order_status(self, sheet_id, worksheet, booth_num, item_name, color, status, user, order_id=None):
+        """Met à jour le statut d'une commande (adressée par son Order ID si fourni)."""
+        try:
+            worksheet_name = worksheet
             
-            # Trouver la ligne à mettre à jour
-            for idx, row in enumerate(data):
-                if (str(row.get('Booth #')) == str(booth_num) and 
-                    row.get('Item') == item_name and 
-                    row.get('Color') == color):
-                    
-                    # Index de ligne dans la feuille (ajouter 2 pour tenir compte de l'en-tête et de l'indexation à 0)
-                    row_index = idx + 2
-                    
-                    # Mettre à jour le statut
-                    worksheet.update_cell(row_index, worksheet.find('Status').col, status)
-                    
-                    # Mettre à jour l'utilisateur
-                    worksheet.update_cell(row_index, worksheet.find('User').col, user)
-                    
-                    # Mettre à jour la date et l'heure
-                    now = datetime.now()
-                    worksheet.update_cell(row_index, worksheet.find('Date').col, now.strftime("%m/%d/%Y"))
-                    worksheet.update_cell(row_index, worksheet.find('Hour').col, now.strftime("%I:%M:%S %p"))
-                    
-                    return True
+            # Verrou de la feuille tenu jusqu'à l'écriture : une suppression concurrente
+            # décalerait la ligne trouvée vers la commande d'un autre exposant
+            with get_row_index(sheet_id, worksheet_name, ORDER_KEY).lock:
+                # Trouver la ligne à mettre à jour (index en cache, vérifié par une lecture ciblée)
+                row_index = self._locate_order(sheet_id, worksheet_name, booth_num, item_name, color, order_id)
+                if row_index is None:
+                    return False
+                
+                # Statut, utilisateur, date et heure écrits en une seule requête
+                now = datetime.now()
+                updates = self._field_updates(sheet_id, worksheet_name, row_index, {
+                    'Status': status,
+                    'User': user,
+                    'Date': now.strftime("%m/%d/%Y"),
+                    'Hour': now.strftime("%I:%M:%S %p"),
+                })
+                self.open_worksheet(sheet_id, worksheet_name).batch_update(updates)
             
-            return False
+            # Ligne modifiée : la synchronisation incrémentale doit relire la feuille
+            invalidate_sync(sheet_id, worksheet_name)
+            record_write(sheet_id)
+            return True
         except Exception as e:
+            self._forget_handles(sheet_id, e)
             st.error(f"Erreur lors de la mise à jour du statut: {e}")
             return False
     
     def update_checklist_item(self, sheet_id, worksheet, booth_num, item_name, data):
         """Met à jour un élément de checklist dans le classeur Booth Checklist."""
+        return self.update_checklist_items(sheet_id, worksheet, [(booth_num, item_name, data)])[0]
+
+    def update_checklist_items(self, sheet_id, worksheet, items):
+        """
+        Met à jour plusieurs éléments de checklist en une seule requête.
+
+        Toutes les lignes sont localisées à partir d'une seule lecture (ou de l'index
+        en cache) puis toutes les modifications sont écrites par un seul batch_update.
+
+        Args:
+            sheet_id (str): ID du classeur Google Sheets
+            worksheet (str): Nom de la feuille (ex. "Booth Checklist")
+            items (list): Tuples (numéro de stand, nom de l'élément, champs), où les champs
+                sont un dict limité à 'Status', 'Date' et 'Hour'
+
+        Returns:
+            list: True ou False pour chaque élément de `items` (False si introuvable)
+        """
+        if not items:
+            return []
         try:
-            # Ouvrir le classeur et accéder à la feuille
-            spreadsheet = self.client.open_by_key(sheet_id)
-            worksheet = spreadsheet.worksheet(worksheet)
-            
-            # Obtenir toutes les valeurs
-            worksheet_data = worksheet.get_all_records()
-            
-            # Trouver la ligne à mettre à jour
-            for idx, row in enumerate(worksheet_data):
-                if (str(row.get('Booth #')) == str(booth_num) and 
-                    row.get('Item Name') == item_name):
-                    
-                    # Index de ligne dans la feuille (ajouter 2 pour tenir compte de l'en-tête et de l'indexation à 0)
-                    row_index = idx + 2
-                    
-                    # Mettre à jour le statut
-                    if 'Status' in data:
-                        status_col = worksheet.find('Status').col
-                        worksheet.update_cell(row_index, status_col, data['Status'])
-                    
-                    # Mettre à jour la date
-                    if 'Date' in data:
-                        date_col = worksheet.find('Date').col
-                        worksheet.update_cell(row_index, date_col, data['Date'])
-                    
-                    # Mettre à jour l'heure
-                    if 'Hour' in data:
-                        hour_col = worksheet.find('Hour').col
-                        worksheet.update_cell(row_index, hour_col, data['Hour'])
-                    
-                    return True
-            
-            return False
+            keys = [row_key([booth_num, item_name]) for booth_num, item_name, _ in items]
+            # Verrou de la feuille tenu de la localisation jusqu'à l'écriture (voir update_order_status)
+            with get_row_index(sheet_id, worksheet, CHECKLIST_KEY).lock:
+                rows = self._locate_rows(sheet_id, worksheet, CHECKLIST_KEY, keys)
+
+                updates, results = [], []
+                for key, (_, _, data) in zip(keys, items):
+                    row_index = rows.get(key)
+                    if row_index is None:
+                        results.append(False)
+                        continue
+                    fields = {name: data[name] for name in CHECKLIST_FIELDS if name in data}
+                    updates.extend(self._field_updates(sheet_id, worksheet, row_index, fields))
+                    results.append(True)
+
+                if updates:
+                    self.open_worksheet(sheet_id, worksheet).batch_update(updates)
+                    record_write(sheet_id)
+            return results
         except Exception as e:
+            self._forget_handles(sheet_id, e)
             st.error(f"Erreur lors de la mise à jour de l'élément de checklist: {e}")
-            return False
+            return [False] * len(items)
     
     def add_order(self, sheet_id, order_data):
         # """Ajoute une nouvelle commande en utilisant la méthode directe qui fonctionne."""
@@ -241,8 +850,6 @@ class GoogleSheetsManager:
         #     return False
         """Ajoute une commande à Google Sheets."""
         try:
-            sheet = self.client.open_by_key(sheet_id)
-            worksheet = sheet.worksheet("Orders")
             now = datetime.now()
             row_data = [
                 order_data.get('Booth #', ''),
@@ -257,28 +864,36 @@ class GoogleSheetsManager:
                 order_data.get('Type', 'New Order'),
                 order_data.get('Boomers Quantity', ''),
                 order_data.get('Comments', ''),
-                order_data.get('User', '')
+                order_data.get('User', ''),
+                order_data.get('Order ID') or new_order_id()
             ]
-            worksheet.append_row(row_data)
-
-            # Optional: also add to section sheet if it exists
+            # Orders and the section sheet (if any) are written concurrently
+            worksheets = ["Orders"]
             section = order_data.get('Section', '')
-            if section:
-                try:
-                    section_ws = sheet.worksheet(section)
-                    section_ws.append_row(row_data)
-                except:
-                    pass  # Ignore if the section sheet doesn't exist
+            if section and section != "Orders":
+                worksheets.append(section)
+            results = fan_out({
+                name: partial(self.append_order_rows, sheet_id, name, [row_data])
+                for name in worksheets
+            })
+
+            errors = failures(results)
+            if "Orders" in errors:
+                raise errors.pop("Orders")
+            for section_name, error in errors.items():
+                self._forget_handles(sheet_id, error)
+                st.warning(f"Commande enregistrée, mais la feuille de section '{section_name}' n'a pas été mise à jour: {error}")
 
             return True
         except Exception as e:
+            self._forget_handles(sheet_id, e)
             st.error(f"Erreur lors de l'ajout de la commande: {e}")
             return False
 
     # First, add a function to GoogleSheetsManager in data/test_data_manager.py
     # Add this method to your GoogleSheetsManager class:
 
-    def delete_order(self, sheet_id, worksheet, booth_num, item_name, color):
+    def delete_order(self, sheet_id, worksheet, booth_num, item_name, color, order_id=None):
         """
         Delete an order from Google Sheets
         
@@ -288,45 +903,143 @@ class GoogleSheetsManager:
             booth_num (str): The booth number of the order to delete
             item_name (str): The item name of the order to delete
             color (str): The color of the item to delete
+            order_id (str): The Order ID, used instead of booth/item/color when given
         
         Returns:
             bool: True if successful, False otherwise
         """
         try:
-            # Open the specified worksheet
-            sheet = self.client.open_by_key(sheet_id).worksheet(worksheet)
-            
-            # Get all data
-            data = sheet.get_all_values()
-            if not data:
-                return False
-            
-            # Find the row with matching booth number, item name, and color
-            header_row = data[0]
-            booth_col = header_row.index('Booth #') if 'Booth #' in header_row else None
-            item_col = header_row.index('Item') if 'Item' in header_row else None
-            color_col = header_row.index('Color') if 'Color' in header_row else None
-            
-            if booth_col is None or item_col is None or color_col is None:
-                return False
-            
-            row_to_delete = None
-            for i in range(1, len(data)):
-                if (str(data[i][booth_col]) == str(booth_num) and 
-                    data[i][item_col] == str(item_name) and 
-                    data[i][color_col] == str(color)):
-                    row_to_delete = i + 1  # +1 because Google Sheets is 1-indexed
-                    break
-            
-            if row_to_delete:
-                sheet.delete_rows(row_to_delete)
-                return True
-            return False
-        
+            return self._delete_order_row(sheet_id, worksheet, booth_num, item_name, color, order_id)
         except Exception as e:
+            self._forget_handles(sheet_id, e)
             print(f"Error deleting order: {e}")
             return False
 
+    def _delete_order_row(self, sheet_id, worksheet, booth_num, item_name, color, order_id=None):
+        """
+        Supprime la ligne d'une commande, localisée par l'index de son Order ID
+        (ou de (stand, article, couleur), voir _order_keys).
+
+        La ligne est vérifiée par une lecture ciblée avant delete_rows, puis les index
+        de la feuille sont décalés localement : aucune lecture complète de la feuille.
+        Lève les erreurs d'API.
+
+        Returns:
+            bool: True si la ligne a été supprimée, False si la commande est introuvable
+        """
+        # Verrou de la feuille (commun à tous ses index) tenu jusqu'au décalage :
+        # deux suppressions ne visent jamais une ligne périmée
+        with get_row_index(sheet_id, worksheet, ORDER_KEY).lock:
+            row_number = self._locate_order(sheet_id, worksheet, booth_num, item_name, color, order_id)
+            if row_number is None:
+                return False
+            try:
+                self.open_worksheet(sheet_id, worksheet).delete_rows(row_number)
+            except Exception:
+                invalidate_row_indexes(sheet_id, worksheet)
+                raise
+            shift_row_indexes(sheet_id, worksheet, [row_number])
+
+        # Les lignes suivantes ont été décalées : relecture complète au prochain rafraîchissement
+        invalidate_sync(sheet_id, worksheet)
+        record_write(sheet_id)
+        return True
+
+    def delete_orders(self, sheet_id, keys):
+        """
+        Supprime plusieurs commandes (ex. annulation d'un stand) en une seule requête.
+
+        Toutes les lignes sont localisées d'un coup par l'index des commandes, puis
+        supprimées par un seul batchUpdate : une requête deleteDimension par plage de
+        lignes contiguës, de la dernière à la première, pour "Orders" et les
+        feuilles de section. Une commande absente de "Orders" n'est pas supprimée
+        de sa feuille de section.
+
+        Args:
+            sheet_id (str): ID du classeur Google Sheets
+            keys (list): Tuples (stand, article, couleur) ou (stand, article, couleur, section) ;
+                une clé répétée supprime autant de lignes
+
+        Returns:
+            dict: {feuille: nombre de lignes supprimées} (vide en cas d'erreur)
+        """
+        counts = {}
+        for booth_num, item_name, color, *section in keys:
+            key = row_key([booth_num, item_name, color])
+            worksheets = ["Orders"]
+            if section and section[0] and section[0] != "Orders":
+                worksheets.append(section[0])
+            for worksheet in worksheets:
+                worksheet_counts = counts.setdefault(worksheet, {})
+                worksheet_counts[key] = worksheet_counts.get(key, 0) + 1
+
+        try:
+            with ExitStack() as stack:
+                requests, deleted = [], {}
+                # "Orders" est traitée en premier : une feuille de section ne perd jamais
+                # plus de lignes par clé que "Orders" n'en a trouvé
+                remaining = None
+                for worksheet, worksheet_counts in counts.items():
+                    if remaining is not None:
+                        worksheet_counts = {key: min(count, remaining.get(key, 0)) for key, count in worksheet_counts.items()}
+                        for key, count in worksheet_counts.items():
+                            remaining[key] -= count
+                        worksheet_counts = {key: count for key, count in worksheet_counts.items() if count}
+                        if not worksheet_counts:
+                            continue
+                    index = get_row_index(sheet_id, worksheet, ORDER_KEY)
+                    # Verrous tenus jusqu'au décalage des index (voir _delete_order_row)
+                    stack.enter_context(index.lock)
+                    try:
+                        found = self._locate_all_rows(sheet_id, worksheet, ORDER_KEY, worksheet_counts)
+                        sheet_gid = self.open_worksheet(sheet_id, worksheet).id
+                    except Exception as e:
+                        if worksheet == "Orders":
+                            raise
+                        self._forget_handles(sheet_id, e)
+                        st.warning(f"La feuille de section '{worksheet}' n'a pas été mise à jour: {e}")
+                        continue
+                    if worksheet == "Orders":
+                        remaining = {key: len(worksheet_rows) for key, worksheet_rows in found.items()}
+                    rows = [row for worksheet_rows in found.values() for row in worksheet_rows]
+                    if not rows:
+                        continue
+                    deleted[worksheet] = rows
+                    requests.extend(
+                        {
+                            "deleteDimension": {
+                                "range": {
+                                    "sheetId": sheet_gid,
+                                    "dimension": "ROWS",
+                                    "startIndex": start - 1,
+                                    "endIndex": end,
+                                }
+                            }
+                        }
+                        for start, end in row_runs(rows)
+                    )
+
+                if not requests:
+                    return {}
+                try:
+                    self.open_spreadsheet(sheet_id).batch_update({"requests": requests})
+                except Exception:
+                    for worksheet in deleted:
+                        invalidate_row_indexes(sheet_id, worksheet)
+                    raise
+                for worksheet, rows in deleted.items():
+                    shift_row_indexes(sheet_id, worksheet, rows)
+
+            # Les lignes suivantes ont été décalées : relecture complète au prochain rafraîchissement
+            for worksheet in deleted:
+                invalidate_sync(sheet_id, worksheet)
+            record_write(sheet_id)
+            return {worksheet: len(rows) for worksheet, rows in deleted.items()}
+        except Exception as e:
+            self._forget_handles(sheet_id, e)
+            st.error(f"Erreur lors de la suppression des commandes: {e}")
+            return {}
+
     # Next, add a direct deletion function in data/direct_sheets_operations.py
     # Add this function:
 
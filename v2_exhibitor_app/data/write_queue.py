@@ -0,0 +1,262 @@
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from functools import partial
+
+from data.disk_cache import CACHE_DIR
+from data.fanout import fan_out
+from data.quota import transient_error
+from data.test_data_manager import GoogleSheetsManager
+
+# États d'une entrée du journal
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+
+def _booth(booth):
+    return "" if booth is None else str(booth).strip()
+
+
+class WriteQueue:
+    """
+    File d'écriture durable (SQLite en mode WAL) vers Google Sheets.
+
+    Chaque entrée est une ligne de commande à ajouter à une feuille (voir
+    GoogleSheetsManager.append_order_rows), identifiée par une clé
+    d'idempotence : une même clé n'est journalisée qu'une fois (double clic,
+    nouvelle exécution du script). Un thread de fond vide la file par lots, avec
+    un seul append_rows par feuille, et réessaie les échecs passagers avec un
+    délai croissant ; une erreur définitive (feuille introuvable, requête refusée)
+    marque l'entrée en échec sans attendre. Chaque tentative est journalisée avant
+    l'envoi : un nouvel essai, y compris après un arrêt du processus en plein
+    envoi, ne rajoute pas les lignes dont l'Order ID est déjà dans la feuille. Les
+    entrées en attente sont reprises au redémarrage du processus.
+
+    Le thread de fond n'appelle jamais Streamlit.
+
+    Args:
+        path (str): Fichier SQLite (par défaut CACHE_DIR/write_queue.sqlite3)
+        batch_size (int): Nombre maximal d'entrées envoyées par cycle
+        poll_interval (float): Attente, en secondes, quand la file est vide
+        max_attempts (int): Tentatives avant de marquer une entrée en échec
+        base_delay (float): Délai avant la première nouvelle tentative, en secondes
+        max_delay (float): Délai maximal entre deux tentatives, en secondes
+        keep_done (float): Durée de conservation des entrées envoyées, en secondes
+    """
+
+    def __init__(self, path=None, batch_size=200, poll_interval=2.0, max_attempts=10,
+                 base_delay=2.0, max_delay=300.0, keep_done=86400):
+        self.path = path or os.path.join(CACHE_DIR, "write_queue.sqlite3")
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.keep_done = keep_done
+        self._lock = threading.Lock()
+        self._ready = False
+        self._wake = threading.Event()
+        self._worker = None
+
+    def _connect(self):
+        if not self._ready:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=10)
+        if not self._ready:
+            with self._lock:
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS writes (
+                        key TEXT PRIMARY KEY,
+                        sheet_id TEXT NOT NULL,
+                        worksheet TEXT NOT NULL,
+                        row TEXT NOT NULL,
+                        status TEXT NOT NULL,
+                        attempts INTEGER NOT NULL DEFAULT 0,
+                        next_attempt REAL NOT NULL,
+                        created_at REAL NOT NULL,
+                        last_error TEXT,
+                        booth TEXT
+                    )
+                    """
+                )
+                # Journal créé avant la colonne du stand
+                columns = {row[1] for row in connection.execute("PRAGMA table_info(writes)")}
+                if "booth" not in columns:
+                    connection.execute("ALTER TABLE writes ADD COLUMN booth TEXT")
+                connection.execute(
+                    "CREATE INDEX IF NOT EXISTS writes_pending ON writes (status, next_attempt, created_at)"
+                )
+                self._ready = True
+        return connection
+
+    def enqueue(self, sheet_id, entries, booth=None):
+        """
+        Journalise des lignes à ajouter, puis réveille le thread d'envoi.
+
+        Args:
+            sheet_id (str): ID du classeur Google Sheets
+            entries (list): Tuples (clé d'idempotence, feuille, ligne)
+            booth (str): Stand qui a passé les commandes (pour `pending` et `failed`)
+
+        Returns:
+            int: Nombre d'entrées réellement ajoutées (les clés connues sont ignorées)
+        """
+        now = time.time()
+        rows = [
+            (key, sheet_id, worksheet, json.dumps(row), PENDING, now, now, _booth(booth))
+            for key, worksheet, row in entries
+        ]
+        with closing(self._connect()) as connection, connection:
+            before = connection.total_changes
+            connection.executemany(
+                """
+                INSERT OR IGNORE INTO writes (key, sheet_id, worksheet, row, status, next_attempt, created_at, booth)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            added = connection.total_changes - before
+        self.start()
+        self._wake.set()
+        return added
+
+    def _count(self, status, sheet_id=None, booth=None, worksheet=None):
+        query = "SELECT COUNT(*) FROM writes WHERE status = ?"
+        params = [status]
+        for column, value in (("sheet_id", sheet_id), ("booth", booth), ("worksheet", worksheet)):
+            if value is not None:
+                query += f" AND {column} = ?"
+                params.append(_booth(value) if column == "booth" else value)
+        with closing(self._connect()) as connection:
+            return connection.execute(query, params).fetchone()[0]
+
+    def pending(self, sheet_id=None, booth=None):
+        """Nombre d'entrées pas encore envoyées (pour tout le journal, un classeur ou un stand)."""
+        return self._count(PENDING, sheet_id, booth)
+
+    def failed(self, sheet_id, booth, worksheet="Orders"):
+        """Nombre de lignes d'un stand abandonnées pour une feuille (par défaut "Orders")."""
+        return self._count(FAILED, sheet_id, booth, worksheet)
+
+    def retry_failed(self, sheet_id, booth):
+        """Remet en attente les entrées abandonnées d'un stand ; retourne leur nombre."""
+        with closing(self._connect()) as connection, connection:
+            cursor = connection.execute(
+                """
+                UPDATE writes SET status = ?, attempts = 0, next_attempt = ?
+                WHERE status = ? AND sheet_id = ? AND booth = ?
+                """,
+                (PENDING, time.time(), FAILED, sheet_id, _booth(booth)),
+            )
+        self.start()
+        self._wake.set()
+        return cursor.rowcount
+
+    def start(self):
+        """Démarre le thread d'envoi (sans effet s'il tourne déjà)."""
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="sheets-write-queue", daemon=True)
+                self._worker.start()
+
+    def _next_batch(self):
+        with closing(self._connect()) as connection:
+            return connection.execute(
+                """
+                SELECT key, sheet_id, worksheet, row, attempts FROM writes
+                WHERE status = ? AND next_attempt <= ?
+                ORDER BY created_at, key LIMIT ?
+                """,
+                (PENDING, time.time(), self.batch_size),
+            ).fetchall()
+
+    def _mark_sending(self, batch):
+        """Compte la tentative avant l'envoi : après un arrêt brutal pendant l'envoi, l'entrée est vérifiée."""
+        with closing(self._connect()) as connection, connection:
+            connection.executemany(
+                "UPDATE writes SET attempts = ? WHERE key = ?",
+                [(attempts + 1, key) for key, _sheet_id, _worksheet, _row, attempts in batch],
+            )
+
+    def _mark_done(self, keys):
+        now = time.time()
+        with closing(self._connect()) as connection, connection:
+            connection.executemany(
+                "UPDATE writes SET status = ?, last_error = NULL WHERE key = ?",
+                [(DONE, key) for key in keys],
+            )
+            connection.execute(
+                "DELETE FROM writes WHERE status = ? AND created_at < ?",
+                (DONE, now - self.keep_done),
+            )
+
+    def _mark_failed(self, entries, error):
+        terminal = not transient_error(error)
+        updates = []
+        for key, attempts in entries:
+            attempts += 1
+            status = FAILED if terminal or attempts >= self.max_attempts else PENDING
+            if status == FAILED:
+                print(f"Écriture différée {key} abandonnée après {attempts} tentative(s): {error}")
+            # Délai exponentiel avec gigue pour ne pas relancer tous les lots ensemble
+            delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+            next_attempt = time.time() + random.uniform(delay / 2, delay)
+            updates.append((status, attempts, next_attempt, str(error), key))
+        with closing(self._connect()) as connection, connection:
+            connection.executemany(
+                "UPDATE writes SET status = ?, attempts = ?, next_attempt = ?, last_error = ? WHERE key = ?",
+                updates,
+            )
+
+    def _flush(self, batch):
+        """Envoie un lot : un append_rows par (classeur, feuille), en parallèle."""
+        groups = {}
+        for key, sheet_id, worksheet, row, attempts in batch:
+            groups.setdefault((sheet_id, worksheet), []).append((key, json.loads(row), attempts))
+
+        self._mark_sending(batch)
+        gs_manager = GoogleSheetsManager()
+        # Après un échec ou un arrêt du processus, l'ajout a pu être appliqué : les lignes
+        # déjà présentes sont ignorées
+        results = fan_out({
+            target: partial(
+                gs_manager.append_order_rows, *target, [row for _key, row, _attempts in group],
+                skip_existing=any(attempts for _key, _row, attempts in group),
+            )
+            for target, group in groups.items()
+        })
+        for (sheet_id, worksheet), result in results.items():
+            group = groups[(sheet_id, worksheet)]
+            if result.ok:
+                self._mark_done([key for key, _row, _attempts in group])
+            else:
+                print(f"Écriture différée vers {worksheet} en échec: {result.error}")
+                self._mark_failed([(key, attempts) for key, _row, attempts in group], result.error)
+
+    def _run(self):
+        while True:
+            try:
+                batch = self._next_batch()
+            except Exception as e:
+                print(f"Lecture du journal d'écriture impossible: {e}")
+                batch = []
+            if not batch:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+                continue
+            try:
+                self._flush(batch)
+            except Exception as e:
+                print(f"Erreur du thread d'écriture: {e}")
+                self._wake.wait(self.poll_interval)
+
+
+# File partagée par tout le processus
+order_queue = WriteQueue()
@@ -1,12 +1,15 @@
 import streamlit as st
 import pandas as pd
 import time
+import uuid
 from datetime import datetime
 from PIL import Image
 # Import custom components
 from components import create_landing_animation, create_card_layout
 
 from data.test_data_manager import GoogleSheetsManager
+from data.snapshot_service import SnapshotService
+from data.write_queue import order_queue
 
 # Page configuration with friendly title and wide layout
 st.set_page_config(
@@ -149,17 +152,47 @@ st.markdown("""
 # Initialize the Google Sheets manager
 gs_manager = GoogleSheetsManager()
 
+# Replace with actual sheet ID from your secrets when deploying
+SHEET_ID = "1dYeok-Dy_7a03AhPDLV2NNmGbRNoCD3q0zaAHPwxxCE"
+
+# One-time migration, once per server process and before any order is sent:
+# give Orders and the section sheets their "Order ID" column
+@st.cache_resource
+def migrate_order_ids():
+    return gs_manager.migrate_order_ids(SHEET_ID)
+
+migrate_order_ids()
+
+# Resume sending orders journaled before the last restart
+order_queue.start()
+
+# Columns the portal actually reads from each worksheet
+WORKBOOK_COLUMNS = {
+    "Shows": ["Show Name"],
+    "Show Inventory": ["Items"],
+    "Orders": ["Booth #", "Exhibitor Name", "Item", "Color", "Quantity", "Date", "Hour", "Status", "Order ID"],
+}
+
+# Process-wide snapshot service: a background poller publishes a new immutable
+# version of the workbook whenever it changes; sessions only read the latest one
+@st.cache_resource
+def snapshot_service():
+    # Orders only grows at the tail, so only the new rows are downloaded,
+    # and only the columns the portal displays are fetched
+    service = SnapshotService(gs_manager, SHEET_ID, WORKBOOK_COLUMNS, incremental=["Orders"])
+    return service.start()
+
+# Function to get the current workbook (no network call, whatever the number of sessions)
+def load_workbook():
+    workbook = snapshot_service().get()
+    if workbook is None:
+        raise RuntimeError("Workbook not loaded yet")
+    return workbook
+
 # Function to load available shows
-@st.cache_data(ttl=300)  # Cache for 5 minutes
 def load_shows():
     try:
-        # Replace with actual sheet ID from your secrets when deploying
-        sheet_id = "1dYeok-Dy_7a03AhPDLV2NNmGbRNoCD3q0zaAHPwxxCE"
-        shows_df = gs_manager.get_data(sheet_id, "Shows")
-        
-        # Process the data: assume first row contains headers
-        shows_df.columns = shows_df.iloc[0].str.strip()
-        shows_df = shows_df[1:].reset_index(drop=True)
+        shows_df = load_workbook()["Shows"]
         
         # Extract show names from the data
         show_list = shows_df["Show Name"].dropna().tolist() if "Show Name" in shows_df.columns else []
@@ -186,6 +219,14 @@ if "logged_in" not in st.session_state:
 if "reload_data" not in st.session_state:
     st.session_state.reload_data = False
 
+# Order lines waiting to be submitted together
+if "cart" not in st.session_state:
+    st.session_state.cart = []
+
+# Idempotency key of the current cart: resubmitting it never duplicates orders
+if "cart_key" not in st.session_state:
+    st.session_state.cart_key = uuid.uuid4().hex
+
 # Landing page for selecting show and booth
 def show_landing_page():
     # Create columns for better layout
@@ -213,6 +254,8 @@ def show_landing_page():
                     st.session_state.booth_number = booth_number
                     st.session_state.selected_show = selected_show
                     st.session_state.logged_in = True
+                    # Check Google Sheets for newer data while the page reruns
+                    snapshot_service().refresh()
                     st.rerun()
                 else:
                     st.error("Please enter both your show and booth number to continue.")
@@ -220,52 +263,35 @@ def show_landing_page():
         # Add some friendly help text
         st.caption("Need help? Contact our support team at support@expocontractors.com")
 
+# Function to get the shared Orders snapshot (one download per refresh cycle for all booths)
+def load_orders_snapshot():
+    return load_workbook()["Orders"]
+
 # Function to load orders for a specific booth
-@st.cache_data(ttl=120)  # Cache for 2 minutes to simulate real-time updates
 def load_booth_orders(booth_number, show_name):
     try:
-        # Replace with actual sheet ID from your secrets when deploying
-        sheet_id = "1dYeok-Dy_7a03AhPDLV2NNmGbRNoCD3q0zaAHPwxxCE" 
-        
-        # Load orders data
-        orders_df = gs_manager.get_data(sheet_id, "Orders")
-        
-        # Process the dataframe: assume first row contains headers
-        if not orders_df.empty:
-            orders_df.columns = orders_df.iloc[0].str.strip()
-            orders_df = orders_df[1:].reset_index(drop=True)
-            
-            # Filter for the booth number
-            if "Booth #" in orders_df.columns:
-                # Convert booth numbers to string for comparison
-                orders_df["Booth #"] = orders_df["Booth #"].astype(str)
-                booth_orders = orders_df[orders_df["Booth #"] == str(booth_number)]
-                return booth_orders
-            else:
-                st.warning("Data format issue: 'Booth #' column not found")
-                return pd.DataFrame()
-        else:
+        snapshot = load_orders_snapshot()
+
+        if snapshot.empty:
             st.warning("No orders data found")
             return pd.DataFrame()
+        if "Booth #" not in snapshot.df.columns:
+            st.warning("Data format issue: 'Booth #' column not found")
+            return pd.DataFrame()
+
+        # Slice the booth's rows straight from the prebuilt index
+        return snapshot.booth_orders(booth_number)
     except Exception as e:
         st.error(f"Error loading orders: {e}")
         return pd.DataFrame()
 
 # Function to load available items for ordering
-@st.cache_data(ttl=300)  # Cache for 5 minutes
 def load_inventory():
     try:
-        # Replace with actual sheet ID from your secrets when deploying
-        sheet_id = "1dYeok-Dy_7a03AhPDLV2NNmGbRNoCD3q0zaAHPwxxCE"
-        
         # Load inventory data
-        inventory_df = gs_manager.get_data(sheet_id, "Show Inventory")
+        inventory_df = load_workbook()["Show Inventory"]
         
-        # Process the dataframe: assume first row contains headers
         if not inventory_df.empty:
-            inventory_df.columns = inventory_df.iloc[0].str.strip()
-            inventory_df = inventory_df[1:].reset_index(drop=True)
-            
             # Extract available items
             available_items = inventory_df["Items"].dropna().tolist() if "Items" in inventory_df.columns else []
             return available_items
@@ -337,36 +363,10 @@ def load_inventory():
 #         return f"Exhibitor {booth_number}"  # on error
 
 def get_exhibitor_name(booth_number):
+    booth_number = str(booth_number).strip()
     try:
-        sheet_id = "1dYeok-Dy_7a03AhPDLV2NNmGbRNoCD3q0zaAHPwxxCE"
-        
-        # Load Orders sheet
-        orders_df = gs_manager.get_data(sheet_id, "Orders")
-        
-        # Convert booth_number to string for comparison
-        booth_number = str(booth_number).strip()
-        
-        # Based on your sample data, we need to find rows where:
-        # - Column 1 (index 0) contains the booth number
-        # - Column 3 (index 2) contains the exhibitor name
-        
-        # First, find the row index where the exhibitor name header is located
-        header_row = -1
-        for i, row in orders_df.iterrows():
-            if "Exhibitor Name" in str(row):
-                header_row = i
-                break
-        
-        if header_row >= 0:
-            # Start searching from the row after the header
-            for i in range(header_row + 1, len(orders_df)):
-                current_booth = str(orders_df.iloc[i, 0]).strip() if pd.notna(orders_df.iloc[i, 0]) else ""
-                if current_booth == booth_number and pd.notna(orders_df.iloc[i, 2]):
-                    return str(orders_df.iloc[i, 2]).strip()
-        
-        # If no match found, return default
-        return f"Exhibitor {booth_number}"
-        
+        # Dict lookup in the shared Orders snapshot: no API call on reruns
+        return load_orders_snapshot().exhibitor_name(booth_number, f"Exhibitor {booth_number}")
     except Exception as e:
         # On error, return the default
         return f"Exhibitor {booth_number}"
@@ -387,7 +387,9 @@ def show_dashboard():
     
     # Check if we need to reload data
     if st.session_state.get('reload_data', False):
-        load_booth_orders.clear()
+        # Wait (bounded) for the poller to publish the latest version of the workbook
+        with st.spinner("Refreshing your data..."):
+            snapshot_service().refresh(wait=10)
         st.session_state.reload_data = False
     
     # Tab 1: Orders Overview
@@ -395,6 +397,19 @@ def show_dashboard():
         # Get booth's orders
         booth_orders = load_booth_orders(st.session_state.booth_number, st.session_state.selected_show)
         
+        # Orders still in the local write queue are not in Google Sheets yet
+        try:
+            if order_queue.failed(SHEET_ID, st.session_state.booth_number):
+                st.error("Some of your recent orders could not be sent to our team. "
+                         "Please retry, or contact support if this keeps happening.")
+                if st.button("Retry sending", key="retry_failed_orders"):
+                    order_queue.retry_failed(SHEET_ID, st.session_state.booth_number)
+                    st.rerun()
+            if order_queue.pending(SHEET_ID, st.session_state.booth_number):
+                st.caption("⏳ Recently placed orders are being sent and will appear here shortly.")
+        except Exception as e:
+            print(f"Could not read the write queue: {e}")
+        
         if not booth_orders.empty:
             st.subheader(f"Your Current Orders ({len(booth_orders)})")
             
@@ -412,7 +427,8 @@ def show_dashboard():
                 2. Select the item you need from the dropdown
                 3. Enter the quantity
                 4. Add any special requests in the comments
-                5. Click 'Place Order' to submit your request
+                5. Click 'Add to Cart' and repeat for every item you need
+                6. Click 'Place Order' to submit your whole cart at once
                 
                 Our team will process your order as soon as possible!
                 """)
@@ -424,7 +440,7 @@ def show_dashboard():
         
         st.subheader("Place a New Order")
         
-        with st.form("new_order_form"):
+        with st.form("new_order_form", clear_on_submit=True):
             # Create a cleaner layout with columns
             col1, col2 = st.columns(2)
             
@@ -459,17 +475,17 @@ def show_dashboard():
                     help="Add any additional information about your order"
                 )
             
-            # Submit button with better styling
+            # Add-to-cart button with better styling
             submit_col1, submit_col2, submit_col3 = st.columns([1, 2, 1])
             with submit_col2:
-                submitted = st.form_submit_button("Place Order", use_container_width=True)
+                submitted = st.form_submit_button("Add to Cart", use_container_width=True)
             
             if submitted:
                 if not item:
                     st.error("Please select an item to order.")
                 else:
-                    # Prepare the order data
-                    order_data = {
+                    # Prepare the order line; nothing is sent until the cart is submitted
+                    st.session_state.cart.append({
                         'Booth #': st.session_state.booth_number,
                         'Exhibitor Name': f"Booth {st.session_state.booth_number}",  # Can be updated if we collect exhibitor name
                         'Section': "Main Floor",  # Default section
@@ -480,31 +496,63 @@ def show_dashboard():
                         'Type': "New Order",
                         'Comments': comments,
                         'User': f"Exhibitor-{st.session_state.booth_number}"  # Track that this came from an exhibitor
-                    }
-                    
-                    # Add new order to Google Sheets
+                    })
+                    st.success(f"{item} added to your cart.")
+        
+        # Cart review and submission
+        cart = st.session_state.cart
+        if cart:
+            st.subheader(f"Your Cart ({len(cart)} item{'s' if len(cart) > 1 else ''})")
+            
+            for idx, line in enumerate(cart):
+                line_col, remove_col = st.columns([5, 1])
+                with line_col:
+                    st.markdown(f"**{line['Item']}** × {line['Quantity']} — {line['Color'].strip()}")
+                    if line['Comments']:
+                        st.caption(line['Comments'])
+                with remove_col:
+                    if st.button("Remove", key=f"cart_remove_{idx}", use_container_width=True):
+                        cart.pop(idx)
+                        st.rerun()
+            
+            place_col1, place_col2, place_col3 = st.columns([1, 2, 1])
+            with place_col2:
+                place_order = st.button("Place Order", type="primary", use_container_width=True)
+            
+            if place_order:
+                # Journal the cart locally; a background worker sends it to Google Sheets
+                try:
+                    from data.direct_sheets_operations import direct_add_orders, queue_orders
                     try:
-                        from data.direct_sheets_operations import direct_add_order
-                        success = direct_add_order("1dYeok-Dy_7a03AhPDLV2NNmGbRNoCD3q0zaAHPwxxCE", order_data)
-                        
-                        if success:
-                            # Store the order data in session state for confirmation screen
-                            st.session_state.last_order = order_data
-                            st.session_state.show_confirmation = True
-                            st.session_state.reload_data = True
-                            
-                            # Redirect to confirmation screen
-                            st.rerun()
-                        else:
-                            st.error("There was an error submitting your order. Please try again.")
-                    except Exception as e:
-                        st.error(f"Error: {e}")
-                        st.info("For testing purposes, we'll simulate a successful order.")
-                        
-                        # For demo without actual Google Sheets
-                        st.session_state.last_order = order_data
+                        queue_orders(SHEET_ID, cart, st.session_state.cart_key)
+                        success = True
+                    except Exception as queue_error:
+                        # Local journal unavailable: write to Google Sheets right away
+                        print(f"Write queue unavailable, sending directly: {queue_error}")
+                        success = direct_add_orders(SHEET_ID, cart)
+                    
+                    if success:
+                        # Store the submitted lines in session state for confirmation screen
+                        st.session_state.last_order = list(cart)
+                        st.session_state.cart = []
+                        st.session_state.cart_key = uuid.uuid4().hex
                         st.session_state.show_confirmation = True
+                        st.session_state.reload_data = True
+                        
+                        # Redirect to confirmation screen
                         st.rerun()
+                    else:
+                        st.error("There was an error submitting your order. Please try again.")
+                except Exception as e:
+                    st.error(f"Error: {e}")
+                    st.info("For testing purposes, we'll simulate a successful order.")
+                    
+                    # For demo without actual Google Sheets
+                    st.session_state.last_order = list(cart)
+                    st.session_state.cart = []
+                    st.session_state.cart_key = uuid.uuid4().hex
+                    st.session_state.show_confirmation = True
+                    st.rerun()
 
 # Confirmation screen with animation
 def show_confirmation():
@@ -526,8 +574,33 @@ def show_confirmation():
     component_key = f"confirmation_{datetime.now().timestamp()}"
 
 
-    # Get the last order details
+    # Get the last order details (a whole cart, or a single order from "View Details")
     order = st.session_state.last_order
+    lines = order if isinstance(order, list) else [order]
+
+    if len(lines) == 1:
+        line = lines[0]
+        details = """
+                <strong>Item:</strong> {item}<br>
+                <strong>Quantity:</strong> {quantity}<br>
+                <strong>Color:</strong> {color}<br>
+                <strong>Comments:</strong> {comments}
+        """.format(
+            item=line.get('Item', 'N/A'),
+            quantity=line.get('Quantity', 'N/A'),
+            color=line.get('Color', 'N/A'),
+            comments=line.get('Comments', 'None')
+        )
+    else:
+        details = "<br>".join(
+            "<strong>{item}</strong> × {quantity} — {color}{comments}".format(
+                item=line.get('Item', 'N/A'),
+                quantity=line.get('Quantity', 'N/A'),
+                color=line.get('Color', 'N/A'),
+                comments=f" <em>({line.get('Comments')})</em>" if line.get('Comments') else ""
+            )
+            for line in lines
+        )
 
     # Create a nice confirmation box
     with st.container():
@@ -536,18 +609,10 @@ def show_confirmation():
                     border-left: 5px solid #3498db; margin-bottom: 1rem;">
             <h2 style="color: #2980b9;">Order Summary</h2>
             <p style="font-size: 1.1rem;">
-                <strong>Item:</strong> {item}<br>
-                <strong>Quantity:</strong> {quantity}<br>
-                <strong>Color:</strong> {color}<br>
-                <strong>Comments:</strong> {comments}
+                {details}
             </p>
         </div>
-        """.format(
-            item=order.get('Item', 'N/A'),
-            quantity=order.get('Quantity', 'N/A'),
-            color=order.get('Color', 'N/A'),
-            comments=order.get('Comments', 'None')
-        ), unsafe_allow_html=True)
+        """.format(details=details), unsafe_allow_html=True)
 
     
     html("""
@@ -719,8 +784,6 @@ with st.sidebar:
         
         # Refresh data button
         if st.button("🔄 Refresh Data", use_container_width=True):
-            load_booth_orders.clear()
-            load_inventory.clear()
             st.session_state.reload_data = True
             st.rerun()
         
@@ -731,6 +794,7 @@ with st.sidebar:
             st.session_state.booth_number = None
             st.session_state.selected_show = None
             st.session_state.show_confirmation = False
+            st.session_state.cart = []
             # Reload the page
             st.rerun()
     
@@ -0,0 +1,163 @@
+import pytest
+from gspread.exceptions import APIError
+from gspread.utils import a1_range_to_grid_range
+
+from data import row_index
+from data import test_data_manager as tdm
+from data.row_index import ORDER_KEY, get_row_index, row_key
+from data.test_data_manager import GoogleSheetsManager
+
+HEADER = ["Booth #", "Exhibitor Name", "Item", "Color", "Quantity"]
+
+
+class _Response:
+    status_code = 400
+    headers = {}
+
+    def json(self):
+        return {"error": {"code": 400, "message": "Unable to parse range", "status": "INVALID_ARGUMENT"}}
+
+
+class FakeWorksheet:
+    def __init__(self, title, rows, gid):
+        self.title, self.rows, self.id = title, [list(row) for row in rows], gid
+
+    def read(self, a1):
+        grid = a1_range_to_grid_range(a1) if a1 else {}
+        c0, c1 = grid.get("startColumnIndex", 0), grid.get("endColumnIndex")
+        values = [row[c0:c1] for row in self.rows[grid.get("startRowIndex", 0):grid.get("endRowIndex")]]
+        while values and not any(values[-1]):
+            values.pop()
+        return values
+
+    def booths(self):
+        return [row[0] for row in self.rows[1:]]
+
+
+class FakeSpreadsheet:
+    """Classeur en mémoire : batchGet et deleteDimension, erreurs 400 programmables."""
+
+    def __init__(self, sheets):
+        self.sheets = {title: FakeWorksheet(title, rows, gid) for gid, (title, rows) in enumerate(sheets.items())}
+        self.requests = []
+        self.fail_update = False
+
+    def open_by_key(self, sheet_id):
+        return self
+
+    def worksheets(self):
+        return list(self.sheets.values())
+
+    def values_batch_get(self, ranges, params=None):
+        value_ranges = []
+        for name in ranges:
+            title, _, a1 = name.rpartition("!")
+            if title.strip("'") not in self.sheets:
+                raise APIError(_Response())
+            value_ranges.append({"range": name, "values": self.sheets[title.strip("'")].read(a1)})
+        return {"valueRanges": value_ranges}
+
+    def batch_update(self, body):
+        self.requests.append(body["requests"])
+        if self.fail_update:
+            raise APIError(_Response())
+        by_gid = {worksheet.id: worksheet for worksheet in self.sheets.values()}
+        for request in body["requests"]:
+            grid = request["deleteDimension"]["range"]
+            del by_gid[grid["sheetId"]].rows[grid["startIndex"]:grid["endIndex"]]
+
+
+@pytest.fixture
+def book(monkeypatch):
+    """Orders et deux feuilles de section ; état de module remis à zéro pour chaque test."""
+    fake = FakeSpreadsheet({
+        "Orders": [HEADER, ["108", "A", "Chair", "Red", "1"], ["215", "B", "Table", "", "1"],
+                   ["108", "A", "Chair", "Red", "2"], ["108", "A", "Lamp", "", "1"], ["300", "C", "Chair", "Blue", "1"]],
+        "Main Floor": [HEADER, ["108", "A", "Chair", "Red", "1"], ["108", "A", "Chair", "Red", "2"],
+                       ["108", "A", "Lamp", "", "1"], ["999", "Z", "Chair", "Red", "1"]],
+        "Annex": [HEADER, ["300", "C", "Chair", "Blue", "1"], ["300", "C", "Chair", "Blue", "1"]],
+    })
+    monkeypatch.setattr(tdm, "_handles", tdm._HandleCache())
+    monkeypatch.setattr(tdm, "_headers", {})
+    monkeypatch.setattr(row_index, "_indexes", {})
+    monkeypatch.setattr(GoogleSheetsManager, "client", fake)
+    monkeypatch.setattr(tdm.st, "warning", lambda message: None)
+    monkeypatch.setattr(tdm.st, "error", lambda message: None)
+    return fake
+
+
+def _ranges(requests):
+    return [
+        (request["deleteDimension"]["range"]["sheetId"], request["deleteDimension"]["range"]["startIndex"],
+         request["deleteDimension"]["range"]["endIndex"])
+        for request in requests
+    ]
+
+
+def test_repeated_keys_delete_as_many_rows_in_one_request(book):
+    manager = GoogleSheetsManager()
+
+    deleted = manager.delete_orders("SHEET", [
+        ("108", "Chair", "Red", "Main Floor"),
+        ("108", "Chair", "Red", "Main Floor"),
+        ("108", "Lamp", "", "Main Floor"),
+    ])
+
+    assert deleted == {"Orders": 3, "Main Floor": 3}
+    # Un seul batchUpdate ; plages contiguës fusionnées, de la dernière à la première par feuille
+    assert len(book.requests) == 1
+    assert _ranges(book.requests[0]) == [(0, 3, 5), (0, 1, 2), (1, 1, 4)]
+    assert book.sheets["Orders"].booths() == ["215", "300"]
+    assert book.sheets["Main Floor"].booths() == ["999"]
+
+
+def test_section_never_loses_more_rows_than_orders(book):
+    manager = GoogleSheetsManager()
+
+    # "Orders" n'a qu'une ligne (300, Chair, Blue) et aucune (999, Chair, Red)
+    deleted = manager.delete_orders("SHEET", [
+        ("300", "Chair", "Blue", "Annex"),
+        ("300", "Chair", "Blue", "Annex"),
+        ("999", "Chair", "Red", "Main Floor"),
+    ])
+
+    assert deleted == {"Orders": 1, "Annex": 1}
+    assert book.sheets["Annex"].booths() == ["300"]
+    assert book.sheets["Main Floor"].booths() == ["108", "108", "108", "999"]
+
+
+def test_missing_section_sheet_still_deletes_from_orders(book):
+    manager = GoogleSheetsManager()
+
+    deleted = manager.delete_orders("SHEET", [("215", "Table", "", "Removed Section")])
+
+    assert deleted == {"Orders": 1}
+    assert book.sheets["Orders"].booths() == ["108", "108", "108", "300"]
+
+
+def test_indexes_are_shifted_after_a_delete(book):
+    manager = GoogleSheetsManager()
+    manager.delete_orders("SHEET", [("215", "Table", "", "Main Floor")])
+
+    index = get_row_index("SHEET", "Orders", ORDER_KEY)
+    assert index.built
+    assert index.find(row_key(["300", "Chair", "Blue"])) == [5]
+
+    # Les lignes suivantes sont retrouvées à leur nouvelle place sans reconstruire l'index
+    assert manager.delete_orders("SHEET", [("300", "Chair", "Blue", "Annex")]) == {"Orders": 1, "Annex": 1}
+    assert _ranges(book.requests[-1]) == [(0, 4, 5), (2, 1, 2)]
+
+
+def test_failed_update_invalidates_indexes(book):
+    manager = GoogleSheetsManager()
+    book.fail_update = True
+
+    assert manager.delete_orders("SHEET", [("108", "Chair", "Red", "Main Floor")]) == {}
+
+    assert not get_row_index("SHEET", "Orders", ORDER_KEY).built
+    assert not get_row_index("SHEET", "Main Floor", ORDER_KEY).built
+    assert book.sheets["Orders"].booths() == ["108", "215", "108", "108", "300"]
+
+    book.fail_update = False
+    assert manager.delete_orders("SHEET", [("108", "Chair", "Red", "Main Floor")]) == {"Orders": 1, "Main Floor": 1}
+    assert book.sheets["Orders"].booths() == ["215", "108", "108", "300"]
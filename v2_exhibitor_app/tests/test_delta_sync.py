@@ -0,0 +1,67 @@
+from data.delta_sync import AppendOnlySync
+
+VALUES = [
+    ["ORDERS"],
+    ["Booth #", "Item", "Color"],
+    ["108", "Chair", "Red"],
+    ["215", "Table"],
+]
+
+
+def _value_ranges(*parts):
+    return [{"values": part} for part in parts]
+
+
+def _synced():
+    sync = AppendOnlySync("Orders")
+    sync.apply(_value_ranges([list(row) for row in VALUES]))
+    return sync
+
+
+def test_first_apply_is_a_full_read():
+    sync = AppendOnlySync("Orders")
+    assert sync.ranges() == ["'Orders'"]
+
+    values = sync.apply(_value_ranges(VALUES))
+
+    assert values == VALUES
+    assert sync.row_count == 4
+
+
+def test_apply_appends_only_the_new_tail():
+    sync = _synced()
+    assert sync.ranges() == ["'Orders'!1:2", "'Orders'!4:4", "'Orders'!A5:C"]
+    before = sync.values
+
+    values = sync.apply(_value_ranges(VALUES[:2], [["215", "Table", ""]], [["301", "Lamp", "White"]]))
+
+    assert values == VALUES + [["301", "Lamp", "White"]]
+    # Les valeurs déjà publiées ne sont pas modifiées en place
+    assert before == VALUES
+
+
+def test_apply_without_new_rows_keeps_values():
+    sync = _synced()
+    assert sync.apply(_value_ranges(VALUES[:2], [VALUES[-1]], [])) == VALUES
+
+
+def test_apply_requests_full_read_when_last_row_changed():
+    sync = _synced()
+
+    assert sync.apply(_value_ranges(VALUES[:2], [["999", "Desk", ""]], [])) is None
+    assert sync.needs_full_sync()
+
+
+def test_apply_requests_full_read_when_header_changed():
+    sync = _synced()
+
+    assert sync.apply(_value_ranges([["ORDERS"], ["Booth #", "Item"]], [VALUES[-1]], [])) is None
+    assert sync.ranges() == sync.full_ranges()
+
+
+def test_apply_stitches_column_blocks():
+    sync = AppendOnlySync("Orders", blocks=((1, 1), (3, 3)))
+
+    values = sync.apply(_value_ranges([["ORDERS"], ["Booth #"], ["108"]], [[], ["Color"], ["Red"]]))
+
+    assert values == [["ORDERS", ""], ["Booth #", "Color"], ["108", "Red"]]
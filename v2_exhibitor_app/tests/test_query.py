@@ -0,0 +1,153 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import pytest
+import requests
+
+from data.query import IndexedQueryBackend, SheetsQueryBackend
+from data.schemas import parse_values
+
+HEADER = ["Booth #", "Section", "Item", "Color", "Quantity"]
+ROWS = [
+    ["108", "Main Floor", "Chair", "Red", "2"],
+    ["108", "Main Floor", "Table", "", "1"],
+    ["215", "Annex", "Chair", "Blue", "4"],
+]
+
+
+class FakeManager:
+    """Gestionnaire minimal : en-têtes, données et sonde de version comptée."""
+
+    def __init__(self, header_idx=0):
+        self.header_idx = header_idx
+        self.version = "2026-01-01T00:00:00Z#0"
+        self.probes = 0
+        self.reads = 0
+        self.failures = 0
+
+    def _load_headers(self, sheet_id, worksheet_names):
+        return {name: (self.header_idx, HEADER) for name in worksheet_names}
+
+    def get_version(self, sheet_id):
+        self.probes += 1
+        return self.version
+
+    def read_many(self, sheet_id, ranges):
+        self.reads += 1
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("Sheets unavailable")
+        return {name: parse_values([HEADER] + ROWS) for name in ranges}
+
+
+@pytest.fixture
+def gviz_server():
+    """Serveur local qui remplace le point d'accès gviz/tq : enregistre les requêtes, répond en CSV."""
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            received.append((url.path, {key: values[0] for key, values in parse_qs(url.query).items()}))
+            body = '"Booth #","Item","Quantity"\n"108","Chair","2"\n"108","Table","1"\n'.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/csv")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/{{sheet_id}}/gviz/tq", received
+    server.shutdown()
+    server.server_close()
+
+
+def test_build_query_selects_and_filters_by_column_letter():
+    query = SheetsQueryBackend().build_query(HEADER, {"Booth #": "108", "Color": "Red"}, ["Item", "Quantity"])
+    assert query == "select C, E where A = 108 and D = 'Red'"
+
+
+def test_build_query_without_columns_or_filter():
+    assert SheetsQueryBackend().build_query(HEADER, {}) == "select *"
+
+
+def test_build_query_escapes_quotes():
+    assert SheetsQueryBackend().build_query(HEADER, {"Item": "Kid's Chair"}) == "select * where C = 'Kid\\'s Chair'"
+
+
+def test_build_query_rejects_unknown_column():
+    with pytest.raises(KeyError):
+        SheetsQueryBackend().build_query(HEADER, {"Show Name": "Expo"})
+
+
+def test_sheets_backend_against_local_server(gviz_server):
+    base_url, received = gviz_server
+    backend = SheetsQueryBackend(base_url=base_url, session=requests.Session(), timeout=5)
+
+    df = backend.run(FakeManager(header_idx=1), "SHEET", "Orders", {"Booth #": "108"}, ["Item", "Quantity"])
+
+    path, params = received[0]
+    assert path == "/SHEET/gviz/tq"
+    assert params["sheet"] == "Orders"
+    assert params["range"] == "A2:E"
+    assert params["tq"] == "select C, E where A = 108"
+    assert params["tqx"] == "out:csv"
+    assert list(df["Item"]) == ["Chair", "Table"]
+    assert list(df["Quantity"]) == [2, 1]
+
+
+def test_indexed_backend_filters_in_memory():
+    backend = IndexedQueryBackend()
+    manager = FakeManager()
+
+    df = backend.run(manager, "SHEET", "Orders", {"Booth #": " 108 ", "Item": "Table"}, ["Item", "Color"])
+
+    assert list(df.index) == [3]
+    assert df.loc[3, "Item"] == "Table"
+    assert pd.isna(df.loc[3, "Color"])
+    assert backend.run(manager, "SHEET", "Orders", {"Booth #": "999"}).empty
+    assert backend.run(manager, "SHEET", "Orders", {"Show Name": "Expo"}).empty
+
+
+def test_indexed_backend_reuses_recent_probe():
+    backend = IndexedQueryBackend(probe_interval=60)
+    manager = FakeManager()
+
+    for _ in range(5):
+        backend.run(manager, "SHEET", "Orders", {"Booth #": "108"})
+
+    assert manager.probes == 1
+    assert manager.reads == 1
+
+
+def test_indexed_backend_rereads_after_local_write():
+    backend = IndexedQueryBackend(probe_interval=60)
+    manager = FakeManager()
+    backend.run(manager, "SHEET", "Orders", {"Booth #": "108"})
+
+    manager.version = "2026-01-01T00:00:00Z#1"
+    backend.expire_probe("SHEET")
+    backend.run(manager, "SHEET", "Orders", {"Booth #": "108"})
+
+    assert manager.probes == 2
+    assert manager.reads == 2
+
+
+def test_indexed_backend_does_not_cache_a_failed_read():
+    backend = IndexedQueryBackend(probe_interval=60)
+    manager = FakeManager()
+    manager.failures = 1
+
+    with pytest.raises(ConnectionError):
+        backend.run(manager, "SHEET", "Orders", {"Booth #": "108"})
+    df = backend.run(manager, "SHEET", "Orders", {"Booth #": "108"})
+
+    assert len(df) == 2
+    assert manager.reads == 2
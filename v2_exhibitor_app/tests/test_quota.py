@@ -0,0 +1,110 @@
+import pytest
+from gspread.exceptions import APIError
+
+from data import quota
+from data.quota import QuotaScheduler, TokenBucket
+
+VALUES_URL = "https://sheets.googleapis.com/v4/spreadsheets/SHEET/values"
+
+
+class _Response:
+    def __init__(self, status_code, retry_after=None):
+        self.status_code = status_code
+        self.headers = {"Retry-After": retry_after} if retry_after else {}
+
+    def json(self):
+        return {"error": {"code": self.status_code, "message": "Quota exceeded", "status": "RESOURCE_EXHAUSTED"}}
+
+
+class FlakySend:
+    """Requête qui échoue avec les statuts programmés, puis réussit."""
+
+    def __init__(self, *statuses):
+        self.statuses = list(statuses)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.statuses:
+            raise APIError(_Response(*self.statuses.pop(0)))
+        return "ok"
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Attentes demandées par l'ordonnanceur, sur une horloge qui n'avance qu'en dormant."""
+    waits = []
+    clock = [1000.0]
+
+    def sleep(seconds):
+        waits.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr(quota.time, "sleep", sleep)
+    monkeypatch.setattr(quota.time, "monotonic", lambda: clock[0])
+    return waits
+
+
+def test_token_bucket_spends_burst_then_spaces_requests():
+    # 62 requêtes par minute dont 2 immédiates : un jeton par seconde ensuite
+    bucket = TokenBucket(per_minute=62, burst=2)
+    bucket.updated = 100.0
+
+    assert [bucket.reserve(100.0) for _ in range(4)] == [0.0, 0.0, 1.0, 2.0]
+    # Les jetons réservés d'avance sont rendus au fil du temps
+    assert bucket.reserve(103.0) == pytest.approx(0.0)
+    assert bucket.reserve(103.0) == pytest.approx(1.0)
+
+
+def test_token_bucket_refill_is_capped_and_drain_empties_it():
+    bucket = TokenBucket(per_minute=62, burst=2)
+    bucket.updated = 0.0
+
+    assert bucket.available(600.0) == 2.0
+    bucket.drain(600.0)
+    assert bucket.available(600.0) == 0.0
+    assert bucket.reserve(600.0) == pytest.approx(1.0)
+
+
+def test_429_is_retried_honouring_retry_after(sleeps):
+    scheduler = QuotaScheduler(base_delay=0, max_retries=3)
+    send = FlakySend((429, "7"), (429,))
+
+    assert scheduler.call("POST", f"{VALUES_URL}/Orders!A1:append", send) == "ok"
+
+    assert send.calls == 3
+    # Après un 429 le seau est vidé : sans Retry-After pour le remplir, la nouvelle
+    # tentative attend un jeton (45 par minute au-delà de la rafale de 15)
+    assert sleeps == [7.0, 0.0, pytest.approx(4 / 3)]
+    metrics = scheduler.metrics()
+    assert (metrics["requests"], metrics["throttled"], metrics["retries"], metrics["failures"]) == (3, 2, 2, 0)
+
+
+def test_503_on_values_append_is_not_retried(sleeps):
+    scheduler = QuotaScheduler(base_delay=0)
+    send = FlakySend((503,))
+
+    with pytest.raises(APIError):
+        scheduler.call("POST", f"{VALUES_URL}/Orders!A1:append", send)
+
+    assert send.calls == 1
+    assert sleeps == []
+
+
+def test_503_on_idempotent_write_is_retried(sleeps):
+    scheduler = QuotaScheduler(base_delay=0)
+    send = FlakySend((503,))
+
+    assert scheduler.call("POST", f"{VALUES_URL}:batchUpdate", send) == "ok"
+    assert send.calls == 2
+
+
+def test_gives_up_after_max_retries(sleeps):
+    scheduler = QuotaScheduler(base_delay=0, max_retries=2)
+    send = FlakySend((429,), (429,), (429,), (429,))
+
+    with pytest.raises(APIError):
+        scheduler.call("GET", f"{VALUES_URL}:batchGet", send)
+
+    assert send.calls == 3
+    assert scheduler.metrics()["failures"] == 1
@@ -0,0 +1,45 @@
+from data.ranges import block_ranges, column_blocks, header_matches, projected_header, stitch_blocks
+
+HEADER = ["Booth #", "Section", "Exhibitor Name", "Item", "Color", "Quantity"]
+
+
+def test_column_blocks_groups_contiguous_columns():
+    assert column_blocks(HEADER, ["Quantity", "Booth #", "Item", "Color", "Unknown"]) == ((1, 1), (4, 6))
+
+
+def test_block_ranges_open_and_closed():
+    blocks = ((1, 1), (4, 6))
+    assert block_ranges("Orders", blocks) == ["'Orders'!A1:A", "'Orders'!D1:F"]
+    assert block_ranges("Orders", blocks, 5, 5) == ["'Orders'!A5:A5", "'Orders'!D5:F5"]
+
+
+def test_stitch_blocks_pads_truncated_cells_and_rows():
+    blocks = ((1, 1), (4, 6))
+    block_values = [
+        [["Booth #"], ["108"], ["215"]],
+        [["Item", "Color", "Quantity"], ["Chair"]],
+    ]
+
+    assert stitch_blocks(blocks, block_values) == [
+        ["Booth #", "Item", "Color", "Quantity"],
+        ["108", "Chair", "", ""],
+        ["215", "", "", ""],
+    ]
+
+
+def test_stitch_blocks_empty():
+    assert stitch_blocks(((1, 2),), [[]]) == []
+
+
+def test_projected_header_pads_columns_past_header():
+    assert projected_header(["Booth #", "Item"], ((2, 3),)) == ["Item", ""]
+
+
+def test_header_matches_detects_moved_columns():
+    header = ["Booth #", "Item", "Color", "Quantity"]
+    values = [["Order Tracking"], ["Item", "Color "], ["Chair", "Red"]]
+
+    assert header_matches(values, 1, header, ((2, 3),))
+    assert not header_matches(values, 0, header, ((2, 3),))
+    assert not header_matches(values, 1, header, ((2, 4),))
+    assert not header_matches([], 1, header, ((2, 3),))
@@ -0,0 +1,48 @@
+import pandas as pd
+
+from data.row_index import ORDER_KEY, RowIndex, row_key, row_runs
+
+
+def test_row_runs_groups_contiguous_rows_last_first():
+    assert row_runs([5, 3, 4, 9, 12, 11]) == [(11, 12), (9, 9), (3, 5)]
+
+
+def test_row_runs_ignores_duplicates_and_empty_input():
+    assert row_runs([7, 7, 8]) == [(7, 8)]
+    assert row_runs([]) == []
+
+
+def _index():
+    frame = pd.DataFrame(
+        {"Booth #": ["108", "108", "215", "108"], "Item": ["Chair", "Table", "Chair", "Chair"], "Color": ["Red", None, "Blue", "Red"]},
+        index=[2, 3, 4, 5],
+    )
+    index = RowIndex(ORDER_KEY)
+    index.rebuild(frame)
+    return index
+
+
+def test_rebuild_groups_rows_by_normalized_key():
+    index = _index()
+    assert index.find(row_key(["108", "Chair", "Red"])) == [2, 5]
+    assert index.find(row_key(["108", "Table", None])) == [3]
+
+
+def test_remove_rows_drops_deleted_rows_and_shifts_following_ones():
+    index = _index()
+
+    index.remove_rows([3, 4])
+
+    assert index.find(row_key(["108", "Table", ""])) == []
+    assert index.find(row_key(["215", "Chair", "Blue"])) == []
+    assert index.find(row_key(["108", "Chair", "Red"])) == [2, 3]
+
+
+def test_remove_rows_shifts_by_deleted_rows_above_only():
+    index = _index()
+
+    index.remove_rows([5, 2])
+
+    assert index.find(row_key(["108", "Chair", "Red"])) == []
+    assert index.find(row_key(["108", "Table", ""])) == [2]
+    assert index.find(row_key(["215", "Chair", "Blue"])) == [3]
@@ -0,0 +1,66 @@
+import pandas as pd
+
+from data.schemas import SCHEMAS, parse_values, range_start_row, schema_for
+
+ORDERS = SCHEMAS["Orders"]
+
+
+def test_parse_values_finds_header_below_title_and_keeps_row_numbers():
+    values = [
+        ["Order Tracking"],
+        ["Booth #", "Item", "Quantity", "Comments"],
+        ["108", "Chair", "2", " note "],
+        [],
+        ["215", "Table"],
+    ]
+
+    df = parse_values(values, ORDERS)
+
+    assert list(df.columns) == ["Booth #", "Item", "Quantity", "Comments"]
+    assert list(df.index) == [3, 5]
+    assert df.index.name == "row"
+    assert df.loc[3, "Comments"] == " note "
+    assert pd.isna(df.loc[5, "Comments"])
+
+
+def test_parse_values_types_numeric_columns():
+    values = [["Booth #", "Item", "Quantity", "Boomers Quantity"], ["108", "Chair", "2", "1.5"], ["215", "Table", "", "x"]]
+
+    df = parse_values(values, ORDERS)
+
+    assert str(df["Quantity"].dtype) == "Int64"
+    assert list(df["Quantity"]) == [2, pd.NA]
+    assert df["Boomers Quantity"].dtype == float
+    assert df.loc[2, "Boomers Quantity"] == 1.5
+    assert pd.isna(df.loc[3, "Boomers Quantity"])
+    # Les identifiants de stand restent du texte
+    assert df.loc[2, "Booth #"] == "108"
+
+
+def test_parse_values_pads_short_rows_and_truncates_long_ones():
+    df = parse_values([["Booth #", "Item"], ["108"], ["215", "Table", "extra"]], ORDERS, first_row=10)
+
+    assert list(df.index) == [11, 12]
+    assert pd.isna(df.loc[11, "Item"])
+    assert df.loc[12, "Item"] == "Table"
+
+
+def test_parse_values_skips_blank_and_duplicate_header_names():
+    df = parse_values([["Booth #", "", "Item", "Item"], ["108", "a", "Chair", "Table"]])
+
+    assert list(df.columns) == ["Booth #", "Item"]
+    assert df.loc[2, "Item"] == "Chair"
+
+
+def test_parse_values_empty_inputs():
+    assert parse_values([], ORDERS).empty
+    header_only = parse_values([["Booth #", "Item"]], ORDERS)
+    assert header_only.empty
+    assert list(header_only.columns) == ["Booth #", "Item"]
+
+
+def test_section_sheets_use_the_orders_schema():
+    assert schema_for("'Main Floor'!A1:M") is ORDERS
+    assert schema_for("Shows").key_columns == ("Show Name",)
+    assert range_start_row("'Orders'!A3:M500") == 3
+    assert range_start_row("Orders") == 1
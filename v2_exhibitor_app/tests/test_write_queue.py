@@ -0,0 +1,135 @@
+import pytest
+from gspread.exceptions import WorksheetNotFound
+
+from data import write_queue as wq
+from data.write_queue import WriteQueue
+
+
+class FakeSheets:
+    """Remplace GoogleSheetsManager : lignes ajoutées par feuille, erreurs programmées."""
+
+    def __init__(self):
+        self.rows = {}
+        self.calls = []
+        self.errors = []
+
+    def __call__(self):
+        return self
+
+    def append_order_rows(self, sheet_id, worksheet, rows, skip_existing=False):
+        self.calls.append((worksheet, len(rows), skip_existing))
+        if self.errors:
+            raise self.errors.pop(0)
+        existing = self.rows.setdefault(worksheet, [])
+        if skip_existing:
+            ids = {row[-1] for row in existing}
+            rows = [row for row in rows if row[-1] not in ids]
+        existing.extend(rows)
+
+
+class Crash(Exception):
+    """Arrêt du processus simulé."""
+
+
+@pytest.fixture
+def sheets(monkeypatch):
+    fake = FakeSheets()
+    monkeypatch.setattr(wq, "GoogleSheetsManager", fake)
+    # Les tests vident la file eux-mêmes, sans thread d'envoi
+    monkeypatch.setattr(WriteQueue, "start", lambda self: None)
+    return fake
+
+
+def _queue(tmp_path, **kwargs):
+    return WriteQueue(path=str(tmp_path / "queue.sqlite3"), base_delay=0, max_delay=0, **kwargs)
+
+
+def _drain(queue):
+    batch = queue._next_batch()
+    if batch:
+        queue._flush(batch)
+    return len(batch)
+
+
+def _entries(*order_ids):
+    return [(f"{order_id}:Orders", "Orders", ["108", "Chair", order_id]) for order_id in order_ids]
+
+
+def test_enqueue_ignores_known_keys(tmp_path, sheets):
+    queue = _queue(tmp_path)
+
+    assert queue.enqueue("SHEET", _entries("A1", "A2"), booth="108") == 2
+    assert queue.enqueue("SHEET", _entries("A1", "A2"), booth="108") == 0
+    assert queue.pending("SHEET", "108") == 2
+    assert queue.pending("SHEET", "215") == 0
+
+    _drain(queue)
+
+    assert queue.enqueue("SHEET", _entries("A1"), booth="108") == 0
+    assert queue.pending() == 0
+    assert [row[-1] for row in sheets.rows["Orders"]] == ["A1", "A2"]
+
+
+def test_transient_error_is_retried_without_duplicates(tmp_path, sheets):
+    queue = _queue(tmp_path)
+    queue.enqueue("SHEET", _entries("A1"), booth="108")
+    sheets.errors.append(ConnectionError("timeout"))
+
+    _drain(queue)
+    assert queue.pending("SHEET", "108") == 1
+    assert queue.failed("SHEET", "108") == 0
+
+    _drain(queue)
+    assert sheets.calls == [("Orders", 1, False), ("Orders", 1, True)]
+    assert queue.pending() == 0
+    assert len(sheets.rows["Orders"]) == 1
+
+
+def test_entry_fails_after_max_attempts(tmp_path, sheets):
+    queue = _queue(tmp_path, max_attempts=2)
+    queue.enqueue("SHEET", _entries("A1"), booth="108")
+    sheets.errors.extend([ConnectionError("timeout"), ConnectionError("timeout")])
+
+    _drain(queue)
+    _drain(queue)
+
+    assert queue.pending() == 0
+    assert queue.failed("SHEET", "108") == 1
+    assert _drain(queue) == 0
+
+
+def test_permanent_error_fails_at_once_and_can_be_retried(tmp_path, sheets):
+    queue = _queue(tmp_path)
+    queue.enqueue("SHEET", _entries("A1"), booth="108")
+    sheets.errors.append(WorksheetNotFound("Orders"))
+
+    _drain(queue)
+    assert queue.failed("SHEET", "108") == 1
+    assert queue.failed("SHEET", "215") == 0
+
+    assert queue.retry_failed("SHEET", "108") == 1
+    _drain(queue)
+    assert queue.failed("SHEET", "108") == 0
+    assert len(sheets.rows["Orders"]) == 1
+
+
+def test_replay_after_crash_does_not_append_twice(tmp_path, sheets, monkeypatch):
+    queue = _queue(tmp_path)
+    queue.enqueue("SHEET", _entries("A1", "A2"), booth="108")
+
+    # Le processus s'arrête après l'ajout, avant que le journal ne le marque envoyé
+    def crash(keys):
+        raise Crash()
+
+    monkeypatch.setattr(queue, "_mark_done", crash)
+    with pytest.raises(Crash):
+        _drain(queue)
+    assert len(sheets.rows["Orders"]) == 2
+
+    restarted = _queue(tmp_path)
+    assert restarted.pending("SHEET", "108") == 2
+    _drain(restarted)
+
+    assert sheets.calls[-1] == ("Orders", 2, True)
+    assert [row[-1] for row in sheets.rows["Orders"]] == ["A1", "A2"]
+    assert restarted.pending() == 0